@@ -2,10 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.schemas.stats import StatsResponse
 from app.crud.stats import get_system_stats
+from app.config import settings
 from app.utils.dependencies import get_db, get_current_admin_user
+from app.utils.cache import cached_json, STATS_KEY
 
 router = APIRouter()
 
 @router.get('/dashboard', response_model=StatsResponse)
 def dashboard(db: Session = Depends(get_db), current_user: dict = Depends(get_current_admin_user)):
-    return get_system_stats(db)
+    # Write paths invalidate STATS_KEY, so the aggregates are recomputed at most once per change
+    return cached_json(STATS_KEY, lambda: get_system_stats(db), ttl=settings.stats_ttl)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from app.utils.dependencies import get_db
+from app import database
+from app.database import db_engine, pool_status
 from app.services.health import check_system
 
 router = APIRouter()
@@ -10,6 +12,16 @@ def liveness():
     return {'status': 'alive'}
 
 @router.get('/readiness')
-def readiness(db: Session = Depends(get_db)):
+def readiness(response: Response, db: Session = Depends(get_db)):
     status = check_system(db)
+    if status['status'] != 'ready':
+        # Load balancers only look at the status code
+        response.status_code = 503
+    return status
+
+@router.get('/pool')
+def pool():
+    status = {'sync': pool_status(db_engine)}
+    if database.async_db_engine is not None:
+        status['async'] = pool_status(database.async_db_engine.sync_engine)
     return status
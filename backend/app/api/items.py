@@ -1,31 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate
-from app.crud.item import create_item, get_item, get_items, update_item, delete_item
+from app.config import settings
+from app.schemas.item import BulkItemResult, ItemBulkUpdate, ItemCreate, ItemResponse, ItemSearchResult, ItemSummary, ItemUpdate, ItemWithOwner
+from app.schemas.user import UserSummary
+from app.crud.item import create_item, create_items, get_item, get_item_version, get_items, update_item, update_items, delete_item, delete_items, export_items_query, search_items
 from app.utils.dependencies import get_db, get_current_user
+from app.utils.pagination import decode_cursor, set_next_cursor
+from app.utils.fields import parse_fields, rows_response
+from app.utils.serialization import FastJSONResponse, row_mapper
+from app.utils.cache import cached_json, item_key
+from app.utils.export import stream_export
+from app.utils.conditional import not_modified, version_headers
 
 router = APIRouter()
 
-@router.get('/', response_model=list[ItemResponse])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_items(db, skip=skip, limit=limit)
+ITEM_MAPPER = row_mapper(ItemResponse)
+OWNER_MAPPER = row_mapper(UserSummary)
+
+# ItemWithOwner documents the include=owner shape; ItemResponse is tried first, so plain rows never load owners
+@router.get('/', response_model=list[Union[ItemResponse, ItemWithOwner]])
+def read_items(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated ItemResponse fields, or 'summary' for ItemSummary"),
+    include: Optional[str] = Query(None, regex='^owner$', description='owner embeds each item owner (see ItemWithOwner)'),
+    owner_loading: str = Query('selectin', regex='^(selectin|joined)$'),
+    owner_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    after_id = decode_cursor(cursor) if cursor else None
+    columns = parse_fields(fields, ItemResponse, ItemSummary)
+    if columns and include:
+        raise HTTPException(status_code=400, detail='include cannot be combined with fields')
+    items = get_items(db, skip=skip, limit=limit, after_id=after_id, fields=columns, owner_loading=owner_loading if include else None, owner_id=owner_id)
+    rendered = None
+    if columns:
+        rendered = rows_response(items)
+    elif include:
+        # Owners are already loaded, so this does not issue a query per item
+        rendered = FastJSONResponse(content=[
+            dict(ITEM_MAPPER(item), owner=OWNER_MAPPER(item.owner) if item.owner else None) for item in items
+        ])
+    elif settings.fast_json_responses:
+        # Rows come straight from the database, so skip per-row response_model validation
+        rendered = FastJSONResponse(content=[ITEM_MAPPER(row) for row in items])
+    set_next_cursor(rendered or response, items, limit)
+    return rendered or items
+
+@router.get('/search', response_model=list[ItemSearchResult])
+def search(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    return rows_response(search_items(db, q, limit))
+
+@router.get('/export')
+def export_items(fmt: str = Query('ndjson', alias='format', regex='^(ndjson|csv)$')):
+    return stream_export(export_items_query(), fmt, 'items')
 
 @router.post('/', response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
 def add_item(item: ItemCreate, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
     return create_item(db, item, current_user.get('id'))
 
+def check_batch_size(batch: list):
+    if len(batch) > settings.bulk_max_items:
+        raise HTTPException(status_code=413, detail=f'Batch exceeds {settings.bulk_max_items} items')
+
+@router.post('/bulk', response_model=list[ItemResponse], status_code=status.HTTP_201_CREATED)
+def add_items(items: list[ItemCreate], db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    check_batch_size(items)
+    return create_items(db, items, current_user.get('id'))
+
+@router.patch('/bulk', response_model=list[BulkItemResult])
+def modify_items(items: list[ItemBulkUpdate], db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    check_batch_size(items)
+    return update_items(db, items)
+
+@router.delete('/bulk', response_model=list[BulkItemResult])
+def remove_items(ids: list[int], db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    check_batch_size(ids)
+    return delete_items(db, ids)
+
 @router.get('/{item_id}', response_model=ItemResponse)
-def read_item(item_id: int, db: Session = Depends(get_db)):
-    item = get_item(db, item_id)
+def read_item(item_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    # Answer revalidations from a narrow version lookup before touching the full row
+    version = get_item_version(db, item_id)
+    if not version:
+        raise HTTPException(status_code=404, detail='Item not found')
+    headers = version_headers('i', *version)
+    unchanged = not_modified(request, headers)
+    if unchanged:
+        return unchanged
+    response.headers.update(headers)
+
+    def load():
+        item = get_item(db, item_id)
+        return ItemResponse.from_orm(item) if item else None
+    item = cached_json(item_key(item_id, version.row_token, version.version), load)
     if not item:
         raise HTTPException(status_code=404, detail='Item not found')
     return item
 
 @router.put('/{item_id}', response_model=ItemResponse)
 def modify_item(item_id: int, item: ItemUpdate, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    return update_item(db, item_id, item)
+    db_item = update_item(db, item_id, item)
+    if not db_item:
+        raise HTTPException(status_code=404, detail='Item not found')
+    return db_item
 
 @router.delete('/{item_id}', status_code=status.HTTP_204_NO_CONTENT)
 def remove_item(item_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    delete_item(db, item_id)
+    if not delete_item(db, item_id):
+        raise HTTPException(status_code=404, detail='Item not found')
     return None
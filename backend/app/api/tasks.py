@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.crud.job import get_job
+from app.schemas.task import TaskStatus
+from app.utils.dependencies import get_db
+
+router = APIRouter()
+
+@router.get('/{task_id}', response_model=TaskStatus)
+def read_task(task_id: str, db: Session = Depends(get_db)):
+    job = get_job(db, task_id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Task not found')
+    return job
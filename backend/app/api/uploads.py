@@ -0,0 +1,61 @@
+import os
+import re
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.utils.conditional import not_modified
+from app.utils.dependencies import get_current_user
+from app.utils.media import RangeFileResponse, file_etag, file_headers, parse_range
+from app.utils.uploads import store_upload
+
+router = APIRouter()
+
+RESUME_TYPES = {'application/pdf', 'application/octet-stream'}
+# <uuid>-<sha256>.pdf from store_upload; older uploads are plain <uuid>.pdf
+RESUME_NAME = re.compile(r'^[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}(?:-(?P<sha256>[0-9a-f]{64}))?\.pdf$')
+
+@router.post('/resumes', status_code=status.HTTP_201_CREATED)
+async def upload_resume(request: Request, current_user: dict = Depends(get_current_user)):
+    # The PDF is the raw request body rather than a multipart field, so it streams straight to disk
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    if content_type not in RESUME_TYPES:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail='Resume must be sent as application/pdf')
+    return await store_upload(
+        request,
+        directory=settings.upload_dir,
+        max_bytes=settings.upload_max_bytes,
+        chunk_size=settings.upload_chunk_size,
+        suffix='.pdf',
+        magic=b'%PDF-',
+    )
+
+@router.get('/resumes/{filename}')
+@router.head('/resumes/{filename}')
+async def read_resume(filename: str, request: Request, current_user: dict = Depends(get_current_user)):
+    # Only names store_upload generates, so the path can't escape upload_dir
+    name = RESUME_NAME.match(filename)
+    if not name:
+        raise HTTPException(status_code=404, detail='Resume not found')
+    path = Path(settings.upload_dir) / filename
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail='Resume not found')
+    digest = name.group('sha256')
+    etag = f'"{digest}"' if digest else await file_etag(path, stat_result)
+    headers = file_headers(etag, stat_result, settings.media_cache_max_age)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+    # PDF viewers fetch pages with Range requests; only the requested bytes are read
+    return RangeFileResponse(
+        path,
+        byte_range=parse_range(request, etag, stat_result.st_size),
+        stat_result=stat_result,
+        headers=headers,
+        media_type='application/pdf',
+        method=request.method,
+        filename=filename,
+        content_disposition_type='inline',
+    )
@@ -1,34 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.crud.user import create_user, get_users, get_user, update_user, delete_user
+from app.config import settings
+from app.schemas.user import UserCreate, UserResponse, UserSummary, UserUpdate
+from app.crud.user import create_user, get_users, get_user, get_user_version, get_user_by_email, update_user, delete_user, export_users_query
 from app.utils.dependencies import get_db, get_current_user
+from app.utils.pagination import decode_cursor, set_next_cursor
+from app.utils.fields import parse_fields, rows_response
+from app.utils.serialization import FastJSONResponse, row_mapper
+from app.utils.cache import cached_json, user_key
+from app.utils.rate_limit import rate_limit
+from app.utils.export import stream_export
+from app.utils.conditional import not_modified, version_headers
+from app.services.auth import get_password_hash_async
 
 router = APIRouter()
 
+USER_MAPPER = row_mapper(UserResponse)
+
 @router.get('/', response_model=list[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_users(db, skip=skip, limit=limit)
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields, or 'summary' for UserSummary"),
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    after_id = decode_cursor(cursor) if cursor else None
+    columns = parse_fields(fields, UserResponse, UserSummary)
+    users = get_users(db, skip=skip, limit=limit, after_id=after_id, fields=columns, is_active=is_active)
+    rendered = None
+    if columns:
+        rendered = rows_response(users)
+    elif settings.fast_json_responses:
+        # Rows come straight from the database, so skip per-row response_model validation
+        rendered = FastJSONResponse(content=[USER_MAPPER(row) for row in users])
+    set_next_cursor(rendered or response, users, limit)
+    return rendered or users
+
+@router.get('/export')
+def export_users(fmt: str = Query('ndjson', alias='format', regex='^(ndjson|csv)$'), current_user: dict = Depends(get_current_user)):
+    return stream_export(export_users_query(), fmt, 'users')
 
-@router.post('/', response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = get_user_by_email(db, user.email)
+@router.post('/', response_model=UserResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit(5, 60))])
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(get_user_by_email, db, user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail='Email already registered')
-    return create_user(db, user)
+    hashed_password = await get_password_hash_async(user.password)
+    return await run_in_threadpool(create_user, db, user, hashed_password)
 
 @router.get('/{user_id}', response_model=UserResponse)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    user = get_user(db, user_id)
+def read_user(user_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    # Answer revalidations from a narrow version lookup before touching the full row
+    version = get_user_version(db, user_id)
+    if not version:
+        raise HTTPException(status_code=404, detail='User not found')
+    headers = version_headers('u', *version)
+    unchanged = not_modified(request, headers)
+    if unchanged:
+        return unchanged
+    response.headers.update(headers)
+
+    def load():
+        user = get_user(db, user_id)
+        return UserResponse.from_orm(user) if user else None
+    user = cached_json(user_key(user_id, version.row_token, version.version), load)
     if not user:
         raise HTTPException(status_code=404, detail='User not found')
     return user
 
 @router.put('/{user_id}', response_model=UserResponse)
-def modify_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    return update_user(db, user_id, user)
+async def modify_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    hashed_password = await get_password_hash_async(user.password) if user.password else None
+    db_user = await run_in_threadpool(update_user, db, user_id, user, hashed_password)
+    if not db_user:
+        raise HTTPException(status_code=404, detail='User not found')
+    return db_user
 
 @router.delete('/{user_id}', status_code=status.HTTP_204_NO_CONTENT)
 def remove_user(user_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    delete_user(db, user_id)
+    if not delete_user(db, user_id):
+        raise HTTPException(status_code=404, detail='User not found')
     return None
@@ -2,9 +2,63 @@ from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = 'sqlite:///./test.db'
+    async_database_url: str = ''
+    migrate_on_startup: bool = True
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+    sqlite_wal: bool = True
+    sqlite_busy_timeout_ms: int = 5000
     secret_key: str = 'supersecret'
     algorithm: str = 'HS256'
     access_token_expire_minutes: int = 30
+    cache_url: str = 'memory://'
+    cache_ttl: int = 60
+    cache_prefix: str = 'app:'
+    rate_limit_url: str = ''
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+    bulk_max_items: int = 5000
+    export_batch_size: int = 1000
+    stats_days: int = 30
+    stats_ttl: int = 300
+    fast_json_responses: bool = False
+    metrics_enabled: bool = True
+    profile_slow_requests_ms: int = 0
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: int = 5
+    profile_dir: str = './profiles'
+    query_budget_per_request: int = 0
+    query_budget_strict: bool = False
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_level: int = 6
+    compression_encodings: list[str] = ['br', 'zstd', 'gzip']
+    compression_content_types: list[str] = ['application/json', 'application/x-ndjson', 'text/', 'application/javascript']
+    job_workers: int = 2
+    job_poll_interval: float = 1.0
+    job_max_attempts: int = 5
+    job_retry_base: float = 5.0
+    job_retry_max: float = 600.0
+    job_lock_timeout: int = 900
+    pipeline_processes: int = 0
+    pipeline_github_concurrency: int = 16
+    pipeline_queue_size: int = 64
+    github_api_url: str = 'https://api.github.com'
+    github_token: str = ''
+    github_stub: bool = False
+    github_stub_latency_ms: int = 200
+    github_revalidate_after: int = 3600
+    result_cache_dir: str = './cache/results'
+    result_cache_ttl: int = 604800
+    upload_dir: str = './uploads/resumes'
+    upload_max_bytes: int = 10 * 1024 * 1024
+    upload_chunk_size: int = 256 * 1024
+    media_cache_max_age: int = 86400
 
     class Config:
         env_file = '.env'
@@ -1,30 +1,227 @@
-from sqlalchemy.orm import Session
+import re
+from typing import Optional
+from sqlalchemy import bindparam, delete, insert, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.database import supports_returning
 from app.models.item import Item
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.item import ItemBulkUpdate, ItemCreate, ItemUpdate
+from app.utils.cache import invalidate, item_key, STATS_KEY
 
 def get_item(db: Session, item_id: int):
     return db.query(Item).filter(Item.id == item_id).first()
 
-def get_items(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Item).offset(skip).limit(limit).all()
+def get_item_version(db: Session, item_id: int):
+    return db.query(Item.id, Item.row_token, Item.version, Item.created_at, Item.updated_at).filter(Item.id == item_id).first()
+
+OWNER_LOADERS = {'selectin': selectinload, 'joined': joinedload}
+
+def items_query(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, fields: Optional[list[str]] = None, owner_loading: Optional[str] = None, owner_id: Optional[int] = None):
+    # With fields, select only those columns and return rows instead of ORM objects
+    query = db.query(*[getattr(Item, name) for name in fields]) if fields else db.query(Item)
+    if owner_id is not None:
+        query = query.filter(Item.owner_id == owner_id)
+    if owner_loading:
+        # selectin issues one extra IN query; joined folds owners into the page query
+        query = query.options(OWNER_LOADERS[owner_loading](Item.owner))
+    query = query.order_by(Item.id)
+    if after_id is not None:
+        return query.filter(Item.id > after_id).limit(limit)
+    return query.offset(skip).limit(limit)
+
+def get_items(db: Session, **kwargs):
+    return items_query(db, **kwargs).all()
+
+def export_items_query():
+    return select(Item.id, Item.title, Item.description, Item.owner_id, Item.created_at, Item.updated_at).order_by(Item.id)
+
+SEARCH_COLUMNS = 'items.id, items.title, items.description, items.owner_id'
+
+def _fts5_query(q: str):
+    # Quote each term so user input can't inject FTS5 operators; prefix-match the last one
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+def search_items(db: Session, q: str, limit: int = 20):
+    dialect = db.bind.dialect.name
+    if dialect == 'sqlite':
+        match = _fts5_query(q)
+        if match is None:
+            return []
+        statement = text(
+            f'SELECT {SEARCH_COLUMNS}, -bm25(items_fts, 10.0, 1.0) AS rank '
+            'FROM items_fts JOIN items ON items.id = items_fts.rowid '
+            'WHERE items_fts MATCH :q ORDER BY bm25(items_fts, 10.0, 1.0) LIMIT :limit'
+        )
+        return db.execute(statement, {'q': match, 'limit': limit}).all()
+    if dialect == 'postgresql':
+        statement = text(
+            f'SELECT {SEARCH_COLUMNS}, ts_rank(items.search_vector, query) AS rank '
+            "FROM items, websearch_to_tsquery('english', :q) AS query "
+            'WHERE items.search_vector @@ query ORDER BY rank DESC LIMIT :limit'
+        )
+        return db.execute(statement, {'q': q, 'limit': limit}).all()
+    pattern = f'%{q}%'
+    return db.execute(
+        select(Item.id, Item.title, Item.description, Item.owner_id, text('0.0 AS rank'))
+        .where(or_(Item.title.ilike(pattern), Item.description.ilike(pattern)))
+        .order_by(Item.id)
+        .limit(limit)
+    ).all()
 
 def create_item(db: Session, item: ItemCreate, user_id: int):
-    db_item = Item(**item.dict(), owner_id=user_id)
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    values = dict(item.dict(), owner_id=user_id)
+    if supports_returning(db, 'insert'):
+        db_item = db.scalar(insert(Item).values(**values).returning(Item))
+        # Detach before commit so the RETURNING values are not expired and re-selected
+        db.expunge(db_item)
+        db.commit()
+    else:
+        db_item = Item(**values)
+        db.add(db_item)
+        db.commit()
+        db.refresh(db_item)
+    invalidate(STATS_KEY)
     return db_item
 
 def update_item(db: Session, item_id: int, item: ItemUpdate):
-    db_item = get_item(db, item_id)
     data = item.dict(exclude_unset=True)
-    for key, value in data.items():
-        setattr(db_item, key, value)
-    db.commit()
-    db.refresh(db_item)
+    if not data:
+        return get_item(db, item_id)
+    data['version'] = Item.version + 1
+    if supports_returning(db, 'update'):
+        db_item = db.scalar(update(Item).where(Item.id == item_id).values(**data).returning(Item))
+        if db_item is None:
+            db.rollback()
+            return None
+        db.expunge(db_item)
+        db.commit()
+    else:
+        updated = db.query(Item).filter(Item.id == item_id).update(data, synchronize_session=False)
+        db.commit()
+        if not updated:
+            return None
+        db_item = get_item(db, item_id)
+    invalidate(STATS_KEY)
     return db_item
 
+def _delete(db: Session, ids: list[int]):
+    # Returns (id, row_token, version) of the deleted rows so their cached bodies can be dropped
+    statement = delete(Item).where(Item.id.in_(ids))
+    if supports_returning(db, 'delete'):
+        return db.execute(statement.returning(Item.id, Item.row_token, Item.version)).all()
+    rows = db.execute(select(Item.id, Item.row_token, Item.version).where(Item.id.in_(ids))).all()
+    db.execute(statement.execution_options(synchronize_session=False))
+    return rows
+
 def delete_item(db: Session, item_id: int):
-    db_item = get_item(db, item_id)
-    db.delete(db_item)
+    deleted = _delete(db, [item_id])
+    db.commit()
+    if deleted:
+        invalidate(STATS_KEY, *(item_key(*row) for row in deleted))
+    return bool(deleted)
+
+def create_items(db: Session, items: list[ItemCreate], user_id: int):
+    rows = [dict(item.dict(), owner_id=user_id) for item in items]
+    if supports_returning(db, 'insert'):
+        # Multi-row INSERT ... RETURNING doesn't promise rows back in input order;
+        # sort_by_parameter_order makes SQLAlchemy correlate them so created[i] matches items[i]
+        statement = insert(Item).returning(
+            Item.id, Item.title, Item.description, Item.owner_id, sort_by_parameter_order=True
+        )
+        created = [dict(row) for row in db.execute(statement, rows).mappings()]
+    else:
+        db_items = [Item(**row) for row in rows]
+        db.add_all(db_items)
+        db.flush()
+        created = [dict(row, id=db_item.id) for row, db_item in zip(rows, db_items)]
     db.commit()
+    invalidate(STATS_KEY)
+    return created
+
+def update_items(db: Session, items: list[ItemBulkUpdate]):
+    ids = [item.id for item in items]
+    existing = set(db.scalars(select(Item.id).where(Item.id.in_(ids))))
+    rows = [item.dict(exclude_unset=True) for item in items if item.id in existing]
+    # Bulk UPDATE by primary key groups rows with the same columns into executemany batches
+    rows = [row for row in rows if len(row) > 1]
+    # One executemany UPDATE per set of changed columns, each also bumping the row version
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    table = Item.__table__
+    for columns, batch in groups.items():
+        values = {name: bindparam(f'b_{name}') for name in columns if name != 'id'}
+        statement = update(table).where(table.c.id == bindparam('b_id')).values(version=table.c.version + 1, **values)
+        db.execute(statement, [{f'b_{name}': value for name, value in row.items()} for row in batch])
+    db.commit()
+    invalidate(STATS_KEY)
+    return [{'id': item_id, 'status': 'updated' if item_id in existing else 'not_found'} for item_id in ids]
+
+def delete_items(db: Session, ids: list[int]):
+    rows = _delete(db, ids)
+    db.commit()
+    invalidate(STATS_KEY, *(item_key(*row) for row in rows))
+    deleted = {row.id for row in rows}
+    return [{'id': item_id, 'status': 'deleted' if item_id in deleted else 'not_found'} for item_id in ids]
+
+async def get_item_async(db: AsyncSession, item_id: int):
+    return await db.get(Item, item_id)
+
+async def get_items_async(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = select(Item).order_by(Item.id)
+    if after_id is not None:
+        query = query.where(Item.id > after_id)
+    else:
+        query = query.offset(skip)
+    result = await db.scalars(query.limit(limit))
+    return result.all()
+
+async def create_item_async(db: AsyncSession, item: ItemCreate, user_id: int):
+    values = dict(item.dict(), owner_id=user_id)
+    if supports_returning(db, 'insert'):
+        db_item = await db.scalar(insert(Item).values(**values).returning(Item))
+        db.expunge(db_item)
+        await db.commit()
+    else:
+        db_item = Item(**values)
+        db.add(db_item)
+        await db.commit()
+        await db.refresh(db_item)
+    invalidate(STATS_KEY)
+    return db_item
+
+async def update_item_async(db: AsyncSession, item_id: int, item: ItemUpdate):
+    data = item.dict(exclude_unset=True)
+    if not data:
+        return await get_item_async(db, item_id)
+    data['version'] = Item.version + 1
+    if supports_returning(db, 'update'):
+        db_item = await db.scalar(update(Item).where(Item.id == item_id).values(**data).returning(Item))
+        if db_item is None:
+            await db.rollback()
+            return None
+        db.expunge(db_item)
+        await db.commit()
+    else:
+        result = await db.execute(update(Item).where(Item.id == item_id).values(**data).execution_options(synchronize_session=False))
+        await db.commit()
+        if not result.rowcount:
+            return None
+        db_item = await get_item_async(db, item_id)
+    invalidate(STATS_KEY)
+    return db_item
+
+async def delete_item_async(db: AsyncSession, item_id: int):
+    statement = delete(Item).where(Item.id == item_id)
+    if supports_returning(db, 'delete'):
+        deleted = (await db.execute(statement.returning(Item.id, Item.row_token, Item.version))).first()
+    else:
+        deleted = (await db.execute(select(Item.id, Item.row_token, Item.version).where(Item.id == item_id))).first()
+        await db.execute(statement.execution_options(synchronize_session=False))
+    await db.commit()
+    if deleted:
+        invalidate(STATS_KEY, item_key(*deleted))
+    return bool(deleted)
@@ -0,0 +1,5 @@
+from sqlalchemy.orm import Session
+from app.models.job import Job
+
+def get_job(db: Session, job_id: str):
+    return db.get(Job, job_id)
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.item import Item
+from app.models.user import User
+
+OWNER_BUCKETS = [(1, 1, '1'), (2, 5, '2-5'), (6, 10, '6-10'), (11, 50, '11-50'), (51, None, '51+')]
+
+def _user_counts(db: Session):
+    row = db.execute(select(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active.is_(True), 1), else_=0)), 0),
+        func.coalesce(func.sum(case((User.is_admin.is_(True), 1), else_=0)), 0),
+    )).one()
+    return row[0], row[1], row[2]
+
+def _items_per_owner(db: Session):
+    per_owner = select(func.count(Item.id).label('n')).group_by(Item.owner_id).subquery()
+    bucket = case(
+        *[(per_owner.c.n <= high, label) for low, high, label in OWNER_BUCKETS if high is not None],
+        else_=OWNER_BUCKETS[-1][2]
+    )
+    rows = db.execute(
+        select(bucket.label('bucket'), func.count(), func.avg(per_owner.c.n)).group_by(bucket)
+    ).all()
+    counts = {label: count for label, count, _ in rows}
+    owners = sum(counts.values())
+    items = sum(count * (avg or 0) for _, count, avg in rows)
+    histogram = [{'label': label, 'count': counts.get(label, 0)} for _, _, label in OWNER_BUCKETS]
+    return histogram, round(items / owners, 2) if owners else 0.0
+
+def _created_daily(db: Session, column, since):
+    day = func.date(column)
+    rows = db.execute(
+        select(day.label('day'), func.count()).where(column >= since).group_by(day).order_by(day)
+    ).all()
+    return [{'day': str(day), 'count': count} for day, count in rows]
+
+def get_system_stats(db: Session):
+    total_users, active_users, admin_users = _user_counts(db)
+    items_per_owner, avg_items_per_owner = _items_per_owner(db)
+    since = datetime.utcnow() - timedelta(days=settings.stats_days)
+    return {
+        'total_users': total_users,
+        'active_users': active_users,
+        'inactive_users': total_users - active_users,
+        'admin_users': admin_users,
+        'total_items': db.scalar(select(func.count(Item.id))),
+        'avg_items_per_owner': avg_items_per_owner,
+        'items_per_owner': items_per_owner,
+        'users_created_daily': _created_daily(db, User.created_at, since),
+        'items_created_daily': _created_daily(db, Item.created_at, since),
+    }
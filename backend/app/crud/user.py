@@ -1,37 +1,184 @@
+from typing import Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.database import supports_returning
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.services.auth import get_password_hash
+from app.utils.cache import invalidate, user_key, STATS_KEY
+from app.services.auth import get_password_hash, get_password_hash_async, verify_and_update_password, verify_and_update_password_async
 
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
+def get_user_version(db: Session, user_id: int):
+    return db.query(User.id, User.row_token, User.version, User.created_at, User.updated_at).filter(User.id == user_id).first()
+
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def users_query(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, fields: Optional[list[str]] = None, is_active: Optional[bool] = None):
+    # With fields, select only those columns and return rows instead of ORM objects
+    query = db.query(*[getattr(User, name) for name in fields]) if fields else db.query(User)
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    query = query.order_by(User.id)
+    if after_id is not None:
+        return query.filter(User.id > after_id).limit(limit)
+    return query.offset(skip).limit(limit)
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
-    db_user = User(email=user.email, name=user.name, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+def get_users(db: Session, **kwargs):
+    return users_query(db, **kwargs).all()
+
+def export_users_query():
+    # Never export password hashes
+    return select(User.id, User.email, User.name, User.is_active, User.is_admin, User.created_at, User.updated_at).order_by(User.id)
+
+def authenticate_user(db: Session, email: str, password: str):
+    db_user = get_user_by_email(db, email)
+    if not db_user:
+        return None
+    valid, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        # Stored hash uses outdated parameters; upgrade it transparently
+        db_user.hashed_password = new_hash
+        db.commit()
+    return db_user
+
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
+    values = {
+        'email': user.email,
+        'name': user.name,
+        'hashed_password': hashed_password or get_password_hash(user.password),
+    }
+    if supports_returning(db, 'insert'):
+        db_user = db.scalar(insert(User).values(**values).returning(User))
+        db.expunge(db_user)
+        db.commit()
+    else:
+        db_user = User(**values)
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+    invalidate(STATS_KEY)
     return db_user
 
-def update_user(db: Session, user_id: int, user: UserUpdate):
-    db_user = get_user(db, user_id)
+def update_user(db: Session, user_id: int, user: UserUpdate, hashed_password: Optional[str] = None):
     data = user.dict(exclude_unset=True)
     if 'password' in data:
-        data['hashed_password'] = get_password_hash(data.pop('password'))
-    for key, value in data.items():
-        setattr(db_user, key, value)
-    db.commit()
-    db.refresh(db_user)
+        password = data.pop('password')
+        data['hashed_password'] = hashed_password or get_password_hash(password)
+    if not data:
+        return get_user(db, user_id)
+    data['version'] = User.version + 1
+    if supports_returning(db, 'update'):
+        db_user = db.scalar(update(User).where(User.id == user_id).values(**data).returning(User))
+        if db_user is None:
+            db.rollback()
+            return None
+        db.expunge(db_user)
+        db.commit()
+    else:
+        updated = db.query(User).filter(User.id == user_id).update(data, synchronize_session=False)
+        db.commit()
+        if not updated:
+            return None
+        db_user = get_user(db, user_id)
+    invalidate(STATS_KEY)
     return db_user
 
 def delete_user(db: Session, user_id: int):
-    db_user = get_user(db, user_id)
-    db.delete(db_user)
+    # Drop the cached body as well; SQLite can give the id to the next user registered
+    statement = delete(User).where(User.id == user_id)
+    if supports_returning(db, 'delete'):
+        deleted = db.execute(statement.returning(User.id, User.row_token, User.version)).first()
+    else:
+        deleted = get_user_version(db, user_id)
+        db.execute(statement.execution_options(synchronize_session=False))
     db.commit()
+    if deleted:
+        invalidate(STATS_KEY, user_key(deleted.id, deleted.row_token, deleted.version))
+    return bool(deleted)
+
+async def get_user_async(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.scalars(select(User).where(User.email == email).limit(1))
+    return result.first()
+
+async def get_users_async(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = select(User).order_by(User.id)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    else:
+        query = query.offset(skip)
+    result = await db.scalars(query.limit(limit))
+    return result.all()
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    db_user = await get_user_by_email_async(db, email)
+    if not db_user:
+        return None
+    valid, new_hash = await verify_and_update_password_async(password, db_user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
+    return db_user
+
+async def create_user_async(db: AsyncSession, user: UserCreate):
+    values = {
+        'email': user.email,
+        'name': user.name,
+        'hashed_password': await get_password_hash_async(user.password),
+    }
+    if supports_returning(db, 'insert'):
+        db_user = await db.scalar(insert(User).values(**values).returning(User))
+        db.expunge(db_user)
+        await db.commit()
+    else:
+        db_user = User(**values)
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+    invalidate(STATS_KEY)
+    return db_user
+
+async def update_user_async(db: AsyncSession, user_id: int, user: UserUpdate):
+    data = user.dict(exclude_unset=True)
+    if 'password' in data:
+        data['hashed_password'] = await get_password_hash_async(data.pop('password'))
+    if not data:
+        return await get_user_async(db, user_id)
+    data['version'] = User.version + 1
+    if supports_returning(db, 'update'):
+        db_user = await db.scalar(update(User).where(User.id == user_id).values(**data).returning(User))
+        if db_user is None:
+            await db.rollback()
+            return None
+        db.expunge(db_user)
+        await db.commit()
+    else:
+        result = await db.execute(update(User).where(User.id == user_id).values(**data).execution_options(synchronize_session=False))
+        await db.commit()
+        if not result.rowcount:
+            return None
+        db_user = await get_user_async(db, user_id)
+    invalidate(STATS_KEY)
+    return db_user
+
+async def delete_user_async(db: AsyncSession, user_id: int):
+    statement = delete(User).where(User.id == user_id)
+    if supports_returning(db, 'delete'):
+        deleted = (await db.execute(statement.returning(User.id, User.row_token, User.version))).first()
+    else:
+        deleted = (await db.execute(select(User.id, User.row_token, User.version).where(User.id == user_id))).first()
+        await db.execute(statement.execution_options(synchronize_session=False))
+    await db.commit()
+    if deleted:
+        invalidate(STATS_KEY, user_key(*deleted))
+    return bool(deleted)
@@ -1,6 +1,151 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
 
-db_engine = create_engine(settings.database_url)
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_total_seconds': round(self.wait_total, 6),
+                'wait_max_seconds': round(self.wait_max, 6),
+                'wait_avg_seconds': round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+def _instrumented(pool_class):
+    class InstrumentedPool(pool_class):
+        metrics = PoolMetrics()
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except Exception:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            self.metrics.record_wait(time.perf_counter() - start)
+            return conn
+
+    InstrumentedPool.__name__ = f'Instrumented{pool_class.__name__}'
+    return InstrumentedPool
+
+InstrumentedQueuePool = _instrumented(QueuePool)
+InstrumentedAsyncQueuePool = _instrumented(AsyncAdaptedQueuePool)
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(database_url, is_async=False):
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    options = {'pool_pre_ping': settings.db_pool_pre_ping}
+    connect_args = {}
+    if backend == 'sqlite':
+        # Sessions are opened in one threadpool worker and used in another
+        connect_args['check_same_thread'] = False
+    elif backend == 'postgresql' and settings.db_statement_timeout_ms:
+        if is_async:
+            connect_args['server_settings'] = {'statement_timeout': str(settings.db_statement_timeout_ms)}
+        else:
+            connect_args['options'] = f'-c statement_timeout={settings.db_statement_timeout_ms}'
+    if not _is_memory_sqlite(url):
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+def _configure_sqlite(engine):
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if settings.sqlite_wal:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}')
+        cursor.close()
+
+def build_engine(database_url):
+    engine = create_engine(database_url, **engine_options(database_url))
+    if engine.dialect.name == 'sqlite':
+        _configure_sqlite(engine)
+    return engine
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.db_max_overflow,
+        )
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
+
+def supports_returning(db, statement):
+    # statement is 'insert', 'update' or 'delete'; works for Session and AsyncSession
+    return getattr(db.bind.dialect, f'{statement}_returning', False)
+
+db_engine = build_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+def get_async_database_url():
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = make_url(settings.database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f'No async driver known for {url.drivername}; set ASYNC_DATABASE_URL')
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+# The async stack is opt-in and its drivers are optional, so build it on first use
+async_db_engine = None
+AsyncSessionLocal = None
+
+def get_async_engine():
+    global async_db_engine, AsyncSessionLocal
+    if async_db_engine is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        async_url = get_async_database_url()
+        async_db_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+        if async_db_engine.dialect.name == 'sqlite':
+            _configure_sqlite(async_db_engine.sync_engine)
+        AsyncSessionLocal = sessionmaker(async_db_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return async_db_engine
@@ -1,14 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from app.api import api_router
+from app.config import settings
 from app.middleware import add_middlewares
-from app.database import db_engine
-from app.models import Base
+from app import database
+from app.migrations import run_migrations
+from app.utils.lazy import LazyRouterApp
+from app.utils.metrics import CONTENT_TYPE, render_metrics
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Deployments run `python -m app.migrations upgrade` once and disable this per worker
+    if settings.migrate_on_startup:
+        await run_in_threadpool(run_migrations, database.db_engine)
+    yield
+    database.db_engine.dispose()
+    if database.async_db_engine is not None:
+        await database.async_db_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 add_middlewares(app)
-Base.metadata.create_all(bind=db_engine)
 app.include_router(api_router, prefix='/api')
+# The ML stack is only imported once /api/ml is first used
+app.mount('/api/ml', LazyRouterApp('app.api.ml', tags=['machine learning']))
 
 @app.get('/')
 def root():
     return {'message': 'Enhanced FastAPI App'}
+
+@app.get('/metrics', include_in_schema=False)
+def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
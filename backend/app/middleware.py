@@ -1,5 +1,10 @@
 from fastapi.middleware.cors import CORSMiddleware
 import os
+from app.config import settings
+from app.database import db_engine
+from app.utils.compression import CompressionMiddleware
+from app.utils.metrics import MetricsMiddleware, instrument_engine
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 def add_middlewares(app):
     # Get frontend URL from environment
@@ -14,10 +19,34 @@ def add_middlewares(app):
         origins = ['*']
         allow_credentials = False
     
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            content_types=settings.compression_content_types,
+            level=settings.compression_level,
+            encodings=settings.compression_encodings
+        )
+
+    if settings.metrics_enabled:
+        instrument_engine(db_engine)
+        # Wraps compression so recorded latency includes encoding time
+        app.add_middleware(
+            MetricsMiddleware,
+            profile_threshold_ms=settings.profile_slow_requests_ms,
+            profile_sample_rate=settings.profile_sample_rate,
+            profile_interval=settings.profile_interval_ms / 1000,
+            profile_dir=settings.profile_dir,
+            query_budget=settings.query_budget_per_request,
+            query_budget_strict=settings.query_budget_strict
+        )
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
         allow_credentials=allow_credentials,
         allow_methods=['*'],
-        allow_headers=['*']
+        allow_headers=['*'],
+        # Cross-origin PDF viewers need the range headers to load pages incrementally
+        expose_headers=[NEXT_CURSOR_HEADER, 'Content-Range', 'Accept-Ranges', 'Content-Length', 'ETag']
     )
@@ -0,0 +1,172 @@
+"""
+Versioned schema migrations.
+
+Usage (from backend/):
+    python -m app.migrations upgrade        apply pending migrations
+    python -m app.migrations check-plans    fail if hot queries fall back to full scans
+"""
+
+import sys
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.crud.item import items_query
+from app.crud.user import users_query
+from app.logger import logger
+from app.models import Base
+from app.models.item import Item
+from app.models.job import Job
+from app.models.user import User
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String, nullable=False),
+    Column('applied_at', DateTime(timezone=True), server_default=func.now()),
+)
+
+def _baseline(conn):
+    Base.metadata.create_all(bind=conn, tables=[User.__table__, Item.__table__])
+
+def _query_indexes(conn):
+    # Existing databases predate these indexes; fresh ones already got them from the baseline
+    for table in (User.__table__, Item.__table__):
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+SQLITE_ITEMS_SEARCH = [
+    # External-content FTS5 table kept in sync by triggers, so every write path updates it
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(title, description, content='items', content_rowid='id')",
+    '''CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF title, description ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO items_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END''',
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_ITEMS_SEARCH = [
+    # A stored generated column is maintained by Postgres on every INSERT/UPDATE
+    '''ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED''',
+    'CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING GIN (search_vector)',
+]
+
+def _items_search(conn):
+    statements = {'sqlite': SQLITE_ITEMS_SEARCH, 'postgresql': POSTGRES_ITEMS_SEARCH}.get(conn.dialect.name, [])
+    for statement in statements:
+        conn.exec_driver_sql(statement)
+
+def _owner_id_index(conn):
+    # Owner listings order by id, which (owner_id, created_at) could not serve without a sort
+    conn.exec_driver_sql('DROP INDEX IF EXISTS ix_items_owner_id_created_at')
+    for index in Item.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+def _jobs(conn):
+    Job.__table__.create(bind=conn, checkfirst=True)
+
+def _row_versions(conn):
+    # Fresh databases already got the column from the baseline
+    for table in ('users', 'items'):
+        columns = {column['name'] for column in inspect(conn).get_columns(table)}
+        if 'version' not in columns:
+            conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+
+# Random 16-hex-digit tokens for rows that predate the column
+ROW_TOKEN_BACKFILL = {
+    'sqlite': "UPDATE {table} SET row_token = lower(hex(randomblob(8))) WHERE row_token = ''",
+    'postgresql': "UPDATE {table} SET row_token = substr(md5(random()::text || id::text), 1, 16) WHERE row_token = ''",
+}
+
+def _row_tokens(conn):
+    for table in ('users', 'items'):
+        columns = {column['name'] for column in inspect(conn).get_columns(table)}
+        if 'row_token' not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN row_token VARCHAR(16) NOT NULL DEFAULT ''")
+        backfill = ROW_TOKEN_BACKFILL.get(conn.dialect.name)
+        if backfill:
+            conn.exec_driver_sql(backfill.format(table=table))
+
+MIGRATIONS = [
+    (1, 'baseline', _baseline),
+    (2, 'query_indexes', _query_indexes),
+    (3, 'items_search', _items_search),
+    (4, 'jobs', _jobs),
+    (5, 'row_versions', _row_versions),
+    (6, 'owner_id_index', _owner_id_index),
+    (7, 'row_tokens', _row_tokens),
+]
+
+def run_migrations(engine: Engine):
+    with engine.begin() as conn:
+        schema_migrations.create(bind=conn, checkfirst=True)
+        applied = set(conn.scalars(select(schema_migrations.c.version)))
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            logger.info(f'Applying migration {version} {name}')
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=name))
+
+# The listing queries the API issues, built by the same crud functions, keyed by the table
+# they must not full-scan
+PLAN_CHECKS = [
+    ('items by owner', 'items', lambda db: items_query(db, owner_id=1, limit=20)),
+    ('items by owner, after cursor', 'items', lambda db: items_query(db, owner_id=1, after_id=100, limit=20)),
+    ('active users', 'users', lambda db: users_query(db, is_active=True, limit=20)),
+    ('active users, after cursor', 'users', lambda db: users_query(db, is_active=True, after_id=100, limit=20)),
+]
+
+def _plan(conn, statement):
+    compiled = statement.compile(bind=conn, compile_kwargs={'literal_binds': True})
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text(f'EXPLAIN QUERY PLAN {compiled}')).all()
+        return [row[-1] for row in rows]
+    if conn.dialect.name == 'postgresql':
+        # Small CI tables make seq scans look cheap; forbid them so only index choice is tested
+        conn.execute(text('SET LOCAL enable_seqscan = off'))
+        return [row[0] for row in conn.execute(text(f'EXPLAIN {compiled}')).all()]
+    return []
+
+def _full_scan(detail: str, table: str) -> bool:
+    if detail.startswith(f'SCAN {table}') and 'USING' not in detail:
+        return True
+    if detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+        return True
+    return 'Seq Scan on ' + table in detail
+
+def check_query_plans(engine: Engine):
+    failures = []
+    with engine.begin() as conn, Session(bind=conn) as db:
+        for name, table, build in PLAN_CHECKS:
+            plan = _plan(conn, build(db).statement)
+            if any(_full_scan(detail, table) for detail in plan):
+                failures.append(f'{name}: {" | ".join(plan)}')
+    return failures
+
+def main(argv):
+    from app.database import db_engine
+    command = argv[1] if len(argv) > 1 else 'upgrade'
+    if command == 'upgrade':
+        run_migrations(db_engine)
+        return 0
+    if command == 'check-plans':
+        run_migrations(db_engine)
+        failures = check_query_plans(db_engine)
+        for failure in failures:
+            print(f'FULL SCAN {failure}')
+        return 1 if failures else 0
+    print(__doc__)
+    return 2
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -1,3 +1,7 @@
+import secrets
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
+
+def new_row_token() -> str:
+    return secrets.token_hex(8)
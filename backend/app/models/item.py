@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.models import Base
+from app.models import Base, new_row_token
 
 class Item(Base):
     __tablename__ = 'items'
@@ -9,6 +9,13 @@ class Item(Base):
     title = Column(String, index=True)
     description = Column(Text, nullable=True)
     owner_id = Column(Integer, ForeignKey('users.id'))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE; timestamps are too coarse to tell quick successive writes apart
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    # Random per row: SQLite hands a deleted row's id to the next insert, so (id, version) alone repeats
+    row_token = Column(String(16), nullable=False, default=new_row_token, server_default='')
     owner = relationship('User')
+
+    # Owner listings page by id; leading owner_id also serves foreign key lookups
+    __table_args__ = (Index('ix_items_owner_id_id', 'owner_id', 'id'),)
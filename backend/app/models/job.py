@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.models import Base
+
+class Job(Base):
+    __tablename__ = 'jobs'
+    id = Column(String(36), primary_key=True)
+    name = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default='queued')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Workers poll for the oldest runnable job of a given status
+    __table_args__ = (Index('ix_jobs_status_run_at', 'status', 'run_at'),)
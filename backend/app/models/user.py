@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, text
 from sqlalchemy.sql import func
-from app.models import Base
+from app.models import Base, new_row_token
 
 class User(Base):
     __tablename__ = 'users'
@@ -10,5 +10,14 @@ class User(Base):
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE; timestamps are too coarse to tell quick successive writes apart
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+    # Random per row: SQLite hands a deleted row's id to the next insert, so (id, version) alone repeats
+    row_token = Column(String(16), nullable=False, default=new_row_token, server_default='')
+
+    # Partial index: only active users are listed by id, inactive rows stay out of it
+    __table_args__ = (
+        Index('ix_users_active_id', 'id', postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+    )
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from app.schemas.user import UserSummary
 
 class ItemBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -18,3 +19,24 @@ class ItemResponse(ItemBase):
 
     class Config:
         orm_mode = True
+
+class ItemWithOwner(ItemResponse):
+    owner: Optional[UserSummary] = None
+
+class ItemSearchResult(ItemResponse):
+    rank: float
+
+class ItemSummary(BaseModel):
+    id: int
+    title: str
+    owner_id: int
+
+    class Config:
+        orm_mode = True
+
+class ItemBulkUpdate(ItemUpdate):
+    id: int
+
+class BulkItemResult(BaseModel):
+    id: int
+    status: str
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+class CountBucket(BaseModel):
+    label: str
+    count: int
+
+class DailyCount(BaseModel):
+    day: str
+    count: int
+
+class StatsResponse(BaseModel):
+    total_users: int
+    active_users: int
+    inactive_users: int
+    admin_users: int
+    total_items: int
+    avg_items_per_owner: float
+    items_per_owner: list[CountBucket]
+    users_created_daily: list[DailyCount]
+    items_created_daily: list[DailyCount]
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+class TaskStatus(BaseModel):
+    id: str
+    name: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
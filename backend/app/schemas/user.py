@@ -37,3 +37,10 @@ class UserResponse(UserBase):
 
     class Config:
         orm_mode = True
+
+class UserSummary(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        orm_mode = True
@@ -1,17 +1,61 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 from app.config import settings
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=settings.bcrypt_rounds)
+
+# bcrypt releases the GIL, so a dedicated thread pool keeps hashing off Starlette's shared threadpool
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.password_hash_max_pending)
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix='bcrypt')
+    return _executor
+
+async def _run_hasher(func, *args):
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Password hashing is saturated, retry shortly',
+            headers={'Retry-After': '1'}
+        )
+    try:
+        future = _get_executor().submit(func, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wrap_future(future)
 
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
+def verify_and_update_password(plain, hashed):
+    return pwd_context.verify_and_update(plain, hashed)
+
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain, hashed):
+    return await _run_hasher(verify_password, plain, hashed)
+
+async def verify_and_update_password_async(plain, hashed):
+    return await _run_hasher(verify_and_update_password, plain, hashed)
+
+async def get_password_hash_async(password):
+    return await _run_hasher(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=settings.access_token_expire_minutes))
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import Counter
+from typing import Optional
+import httpx
+from app.config import settings
+from app.utils.cache import get_result_cache
+
+GITHUB_LOGIN = re.compile(r'github\.com/([A-Za-z0-9-]+)')
+STUB_LANGUAGES = ['Python', 'TypeScript', 'JavaScript', 'Go', 'Rust', 'Java', 'C++', 'Ruby']
+
+def github_login(github_url: Optional[str]) -> Optional[str]:
+    if not github_url:
+        return None
+    match = GITHUB_LOGIN.search(github_url)
+    return match.group(1) if match else github_url.strip('/').rsplit('/', 1)[-1] or None
+
+def stub_transport(latency: float = 0.0):
+    # Deterministic per-login data with simulated API latency, so the GitHub stage runs offline
+    async def handler(request: httpx.Request):
+        await asyncio.sleep(latency)
+        parts = request.url.path.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'users':
+            return httpx.Response(404, json={'message': 'Not Found'})
+        login = parts[1]
+        seed = int(hashlib.sha256(login.encode()).hexdigest(), 16)
+        etag = f'"{hashlib.sha256(request.url.path.encode()).hexdigest()[:16]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304, headers={'ETag': etag})
+        if len(parts) == 2:
+            return httpx.Response(200, headers={'ETag': etag}, json={'login': login, 'public_repos': 5 + seed % 40, 'followers': seed % 500})
+        repos = [
+            {
+                'name': f'{login}-project-{index}',
+                'language': STUB_LANGUAGES[(seed >> index) % len(STUB_LANGUAGES)],
+                'stargazers_count': (seed >> (index * 3)) % 200,
+                'fork': index % 4 == 3,
+                'pushed_at': f'2025-{1 + (seed >> index) % 12:02d}-01T00:00:00Z',
+            }
+            for index in range(5 + seed % 10)
+        ]
+        return httpx.Response(200, headers={'ETag': etag}, json=repos)
+    return httpx.MockTransport(handler)
+
+class GitHubClient:
+    def __init__(self, concurrency: Optional[int] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.concurrency = concurrency or settings.pipeline_github_concurrency
+        self._inflight = {}
+        if transport is None and settings.github_stub:
+            transport = stub_transport(settings.github_stub_latency_ms / 1000)
+        headers = {'Accept': 'application/vnd.github+json'}
+        if settings.github_token:
+            headers['Authorization'] = f'Bearer {settings.github_token}'
+        # One pooled client for the whole batch; keep-alive connections are reused across candidates
+        self._client = httpx.AsyncClient(
+            base_url=settings.github_api_url,
+            headers=headers,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _fetch(self, path, etag=None, **params):
+        # Returns (None, etag) when GitHub answers 304 Not Modified to a conditional request
+        headers = {'If-None-Match': etag} if etag else {}
+        response = await self._client.get(path, params=params, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return response.json(), response.headers.get('ETag')
+
+    async def analyse(self, login: str) -> dict:
+        # Logins are case-insensitive, so normalise before keying the cache
+        login = login.lower()
+        # Candidates in one batch often share a profile; concurrent lookups reuse one fetch
+        if login not in self._inflight:
+            self._inflight[login] = asyncio.ensure_future(self._analyse(login))
+            self._inflight[login].add_done_callback(lambda _: self._inflight.pop(login, None))
+        return await asyncio.shield(self._inflight[login])
+
+    async def _analyse(self, login: str) -> dict:
+        key = f'github:{login}'
+        cache = get_result_cache()
+        cached = cache.get(key) if cache is not None else None
+        entry = json.loads(cached) if cached else {'etags': {}}
+        if cached and time.time() - entry['checked_at'] < settings.github_revalidate_after:
+            return {'login': login, **entry['profile'], **entry['repos']}
+        # Past the revalidation window, conditional requests only refetch what changed
+        (profile, profile_etag), (repos, repos_etag) = await asyncio.gather(
+            self._fetch(f'/users/{login}', entry['etags'].get('profile')),
+            self._fetch(f'/users/{login}/repos', entry['etags'].get('repos'), per_page=100, sort='pushed'),
+        )
+        entry = {
+            'checked_at': time.time(),
+            'etags': {'profile': profile_etag, 'repos': repos_etag},
+            'profile': entry['profile'] if profile is None else _profile_summary(profile),
+            'repos': entry['repos'] if repos is None else _repos_summary(repos),
+        }
+        if cache is not None:
+            cache.set(key, json.dumps(entry).encode(), settings.result_cache_ttl)
+        return {'login': login, **entry['profile'], **entry['repos']}
+
+def _profile_summary(profile):
+    return {'public_repos': profile.get('public_repos', 0), 'followers': profile.get('followers', 0)}
+
+def _repos_summary(repos):
+    owned = [repo for repo in repos if not repo.get('fork')]
+    languages = Counter(repo['language'] for repo in owned if repo.get('language'))
+    return {
+        'total_stars': sum(repo.get('stargazers_count', 0) for repo in owned),
+        'languages': dict(languages.most_common()),
+        'last_push': max((repo['pushed_at'] for repo in owned if repo.get('pushed_at')), default=None),
+    }
@@ -0,0 +1,12 @@
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.logger import logger
+
+def check_system(db: Session):
+    try:
+        db.execute(text('SELECT 1'))
+    except SQLAlchemyError as exc:
+        logger.warning(f'Readiness check failed: {exc}')
+        return {'status': 'unavailable', 'database': 'error'}
+    return {'status': 'ready', 'database': 'ok'}
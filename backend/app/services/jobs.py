@@ -0,0 +1,142 @@
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.logger import logger
+from app.models.job import Job
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Task name -> function; workers import TASK_MODULES so their @task decorators register here
+TASKS = {}
+TASK_MODULES = ['app.services.tasks']
+
+def task(name: str):
+    def decorator(func):
+        TASKS[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def enqueue(db: Session, func, *args, max_attempts: int = None, delay: float = 0, **kwargs) -> str:
+    # Payloads are stored as JSON, so arguments must be JSON-serialisable
+    job = Job(
+        id=str(uuid.uuid4()),
+        name=func.task_name,
+        payload={'args': list(args), 'kwargs': kwargs},
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or settings.job_max_attempts,
+        run_at=_now() + timedelta(seconds=delay),
+    )
+    db.add(job)
+    db.commit()
+    return job.id
+
+def _stale(now):
+    # Running jobs whose lock outlived job_lock_timeout belong to a worker that died mid-task
+    return and_(Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=settings.job_lock_timeout))
+
+def _runnable(now):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        and_(_stale(now), Job.attempts < Job.max_attempts),
+    )
+
+def fail_stale_jobs(db: Session, now: datetime):
+    # A job that keeps killing its worker (OOM, segfault) never reaches fail_job, so cap it here
+    db.execute(
+        update(Job)
+        .where(_stale(now), Job.attempts >= Job.max_attempts)
+        .values(status=FAILED, error='Worker lost while running the job', locked_by=None, locked_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+def claim_job(db: Session, worker_id: str):
+    now = _now()
+    fail_stale_jobs(db, now)
+    # SKIP LOCKED lets Postgres/MySQL workers pass over rows another worker is claiming;
+    # SQLite drops FOR UPDATE and relies on the conditional UPDATE below instead
+    job_id = db.scalar(
+        select(Job.id).where(_runnable(now)).order_by(Job.run_at).limit(1).with_for_update(skip_locked=True)
+    )
+    if job_id is None:
+        db.commit()
+        return None
+    claimed = db.execute(
+        update(Job)
+        .where(Job.id == job_id, _runnable(now))
+        .values(status=RUNNING, locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return db.get(Job, job_id) if claimed else None
+
+def retry_delay(attempts: int) -> float:
+    delay = min(settings.job_retry_base * 2 ** (attempts - 1), settings.job_retry_max)
+    # Jitter keeps jobs that failed together from retrying in lockstep
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+def complete_job(db: Session, job: Job, result):
+    job.status = SUCCEEDED
+    job.result = _jsonable(result)
+    job.error = None
+    job.locked_by = job.locked_at = None
+    db.commit()
+
+def fail_job(db: Session, job: Job, error: str, retry: bool = True):
+    job.error = error
+    job.locked_by = job.locked_at = None
+    if retry and job.attempts < job.max_attempts:
+        job.status = QUEUED
+        job.run_at = _now() + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status = FAILED
+    db.commit()
+
+def run_next_job(worker_id: str) -> bool:
+    with SessionLocal() as db:
+        job = claim_job(db, worker_id)
+        if job is None:
+            return False
+        job_id, name, payload, attempts = job.id, job.name, job.payload, job.attempts
+    # The claim is committed and the session closed, so no transaction stays open while the task runs
+    func = TASKS.get(name)
+    error = result = None
+    if func is None:
+        error = f'Unknown task {name}'
+    else:
+        logger.info(f'Worker {worker_id} running {name} {job_id} (attempt {attempts})')
+        try:
+            result = func(*payload.get('args', []), **payload.get('kwargs', {}))
+        except Exception as exc:
+            logger.exception(f'Task {name} {job_id} failed')
+            error = f'{type(exc).__name__}: {exc}'
+    with SessionLocal() as db:
+        job = db.get(Job, job_id)
+        if job is None or job.locked_by != worker_id:
+            # The lock expired and another worker reclaimed the job; its outcome wins
+            logger.warning(f'Worker {worker_id} lost job {job_id} before recording its result')
+            return True
+        if error is None:
+            complete_job(db, job, result)
+        else:
+            fail_job(db, job, error, retry=func is not None)
+    return True
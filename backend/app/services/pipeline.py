@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+import pypdf
+from app.config import settings
+from app.services.github import GitHubClient, github_login
+from app.utils.cache import get_result_cache
+
+SKILLS = {
+    'python', 'javascript', 'typescript', 'react', 'node', 'next', 'vue', 'angular', 'go', 'rust', 'java',
+    'kotlin', 'swift', 'c++', 'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'docker', 'kubernetes',
+    'aws', 'gcp', 'azure', 'terraform', 'graphql', 'fastapi', 'django', 'flask', 'spark', 'pytorch',
+    'tensorflow', 'microservices', 'ci/cd', 'linux',
+}
+WORD = re.compile(r'[a-z][a-z0-9+#/.]*')
+
+_DONE = object()
+
+def extract_text(path: str) -> str:
+    if Path(path).suffix.lower() != '.pdf':
+        return Path(path).read_text(errors='ignore')
+    reader = pypdf.PdfReader(path)
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_text_cached(path: str) -> str:
+    # Keyed by file content, so a re-uploaded resume is parsed once whatever its filename
+    cache = get_result_cache()
+    if cache is None:
+        return extract_text(path)
+    key = f'resume:{file_digest(path)}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached.decode()
+    text = extract_text(path)
+    cache.set(key, text.encode(), settings.result_cache_ttl)
+    return text
+
+def score_candidate(text: str, github: Optional[dict], focus: Optional[str] = None) -> dict:
+    words = {word.rstrip('.') for word in WORD.findall(text.lower())}
+    skills = sorted(SKILLS & words)
+    focus_words = {word.rstrip('.') for word in WORD.findall((focus or '').lower())} & SKILLS
+    focus_match = len(focus_words & words) / len(focus_words) if focus_words else 1.0
+    score = 40 * min(len(skills) / 10, 1.0) + 30 * focus_match
+    if github:
+        github_languages = {language.lower() for language in github['languages']}
+        score += 15 * min(github['total_stars'] / 100, 1.0)
+        score += 15 * (len(github_languages & words) / len(github_languages) if github_languages else 0.0)
+    return {'score': round(score, 1), 'skills': skills, 'focus_match': round(focus_match, 2)}
+
+async def _stage(name, inbox, outbox, concurrency, handle):
+    async def worker():
+        while (record := await inbox.get()) is not _DONE:
+            if 'error' not in record:
+                try:
+                    await handle(record)
+                except Exception as exc:
+                    # One bad resume or profile shouldn't stop the batch
+                    record['error'] = f'{name}: {type(exc).__name__}: {exc}'
+            await outbox.put(record)
+        # Hand the sentinel back so the other workers of this stage also see it
+        await inbox.put(_DONE)
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await outbox.put(_DONE)
+
+async def run_pipeline(candidates: list[dict], github: Optional[GitHubClient] = None, processes: Optional[int] = None, queue_size: Optional[int] = None) -> list[dict]:
+    # candidates: dicts with resume_path and optional github_url/focus; results keep input order
+    processes = processes or settings.pipeline_processes or os.cpu_count() or 1
+    queue_size = queue_size or settings.pipeline_queue_size
+    loop = asyncio.get_running_loop()
+    to_parse, to_fetch, to_score, done = (asyncio.Queue(maxsize=queue_size) for _ in range(4))
+
+    async def parse(record):
+        record['text'] = await loop.run_in_executor(cpu_pool, extract_text_cached, record['resume_path'])
+
+    async def fetch(record):
+        login = github_login(record.get('github_url'))
+        record['github'] = await client.analyse(login) if login else None
+
+    async def score(record):
+        text = record.pop('text')
+        record.update(await loop.run_in_executor(cpu_pool, score_candidate, text, record['github'], record.get('focus')))
+
+    async def feed():
+        for index, candidate in enumerate(candidates):
+            await to_parse.put({**candidate, 'index': index})
+        await to_parse.put(_DONE)
+
+    async def collect():
+        results = [None] * len(candidates)
+        while (record := await done.get()) is not _DONE:
+            record.pop('text', None)
+            results[record.pop('index')] = record
+        return results
+
+    client = github or GitHubClient()
+    try:
+        # Parse and score share the process pool; each may fill it while the other waits on its queue
+        with ProcessPoolExecutor(max_workers=processes) as cpu_pool:
+            *_, results = await asyncio.gather(
+                feed(),
+                _stage('parse', to_parse, to_fetch, processes, parse),
+                _stage('github', to_fetch, to_score, client.concurrency, fetch),
+                _stage('score', to_score, done, processes, score),
+                collect(),
+            )
+    finally:
+        if github is None:
+            await client.aclose()
+    return results
+
+def process_resumes(candidates: list[dict]) -> list[dict]:
+    return asyncio.run(run_pipeline(candidates))
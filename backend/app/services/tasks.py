@@ -1,14 +1,18 @@
-from fastapi import BackgroundTasks
-import uuid
+from sqlalchemy.orm import Session
 from app.logger import logger
+from app.services.jobs import enqueue, task
+from app.services.pipeline import process_resumes
 
+@task('send_email')
 def send_email(email: str):
     logger.info(f'Sending email to {email}')
     return True
 
-def process_background_task(bg_tasks: BackgroundTasks, task_function, *args, **kwargs):
-    task_id = str(uuid.uuid4())
-    def _run():
-        task_function(*args, **kwargs)
-    bg_tasks.add_task(_run)
-    return task_id
+@task('process_resumes')
+def process_resume_batch(candidates: list[dict]):
+    return process_resumes(candidates)
+
+def process_background_task(db: Session, task_function, *args, **kwargs):
+    # Runs in the worker processes (python -m app.worker), so it survives restarts and
+    # the returned task_id can be polled at GET /api/tasks/{task_id}
+    return enqueue(db, task_function, *args, **kwargs)
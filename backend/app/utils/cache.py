@@ -1,17 +1,370 @@
 import functools
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
 import time
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlparse
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.logger import logger
 
-def cached(expire: int = 300):
+_MISSING = object()
+_registry = {}
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        # Set when the key is invalidated mid-computation; the result is then handed to
+        # callers already waiting but never stored
+        self.invalidated = False
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key, now):
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._data[key]
+            self.evictions += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value, now, ttl=None):
+        self._data[key] = (value, now + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, time.monotonic(), ttl)
+
+    def get_or_compute(self, key, func):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = _Flight()
+        if not owner:
+            # Another caller is already computing this key; wait for its result
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None and not flight.invalidated:
+                    self._store(key, flight.result, time.monotonic())
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.event.set()
+        return flight.result
+
+    def invalidate(self, key):
+        with self._lock:
+            # Later callers start a fresh computation instead of joining one that may be stale
+            flight = self._inflight.pop(key, None)
+            if flight is not None:
+                flight.invalidated = True
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        with self._lock:
+            for flight in self._inflight.values():
+                flight.invalidated = True
+            self._inflight.clear()
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+def _make_key(args, kwargs):
+    return (args, tuple(sorted(kwargs.items())))
+
+def cached(expire: int = 300, maxsize: int = 1024):
     def decorator(func):
-        cache = {}
+        cache = TTLCache(maxsize=maxsize, ttl=expire)
+        _registry[f'{func.__module__}.{func.__qualname__}'] = cache
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            key = (args, tuple(sorted(kwargs.items())))
-            if key in cache:
-                result, timestamp = cache[key]
-                if time.time() - timestamp < expire:
-                    return result
-            result = func(*args, **kwargs)
-            cache[key] = (result, time.time())
-            return result
+            return cache.get_or_compute(_make_key(args, kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        wrapper.invalidate = lambda *args, **kwargs: cache.invalidate(_make_key(args, kwargs))
+        wrapper.cache_clear = cache.clear
         return wrapper
     return decorator
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+class CacheError(Exception):
+    pass
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = 10000, ttl: float = 300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        _registry['cache_backend'] = self._cache
+
+    def get(self, key: str):
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self._cache.set(key, value, ttl)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._cache.invalidate(key)
+
+    def clear(self):
+        self._cache.clear()
+
+class RedisBackend:
+    def __init__(self, url: str, prefix: str = 'app:', timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile('rb')
+        if self.password:
+            self._send('AUTH', self.password)
+        if self.db:
+            self._send('SELECT', self.db)
+
+    def _send(self, *parts):
+        payload = [b'*%d\r\n' % len(parts)]
+        for part in parts:
+            if not isinstance(part, bytes):
+                part = str(part).encode()
+            payload.append(b'$%d\r\n%s\r\n' % (len(part), part))
+        self._local.sock.sendall(b''.join(payload))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError('Connection closed by cache server')
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b'+':
+            return body
+        if prefix == b'-':
+            raise CacheError(body.decode())
+        if prefix == b':':
+            return int(body)
+        if prefix == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            return self._local.reader.read(length + 2)[:-2]
+        if prefix == b'*':
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise CacheError(f'Unexpected reply: {line!r}')
+
+    def _command(self, *parts):
+        if getattr(self._local, 'sock', None) is None:
+            self._connect()
+        try:
+            return self._send(*parts)
+        except OSError:
+            # Drop the broken connection so the next call reconnects
+            self._local.sock.close()
+            self._local.sock = None
+            raise
+
+    def get(self, key: str):
+        return self._command('GET', self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self._command('SET', self.prefix + key, value, 'EX', ttl)
+
+    def incr(self, key: str, ttl: int) -> int:
+        value = self._command('INCR', self.prefix + key)
+        if value == 1:
+            self._command('EXPIRE', self.prefix + key, ttl)
+        return value
+
+    def decr(self, key: str) -> int:
+        return self._command('DECR', self.prefix + key)
+
+    def delete(self, *keys: str):
+        if keys:
+            self._command('DEL', *(self.prefix + key for key in keys))
+
+    def clear(self):
+        cursor = b'0'
+        while True:
+            cursor, keys = self._command('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 500)
+            if keys:
+                self._command('DEL', *keys)
+            if cursor == b'0':
+                break
+
+class FileBackend:
+    def __init__(self, directory: str, ttl: float = 300):
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def _path(self, key: str):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at = float(f.readline())
+                if expires_at >= time.time():
+                    return f.read()
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            pass
+        path.unlink(missing_ok=True)
+        return None
+
+    def set(self, key: str, value: bytes, ttl: int):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers in other processes never see a partial entry
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(f'{time.time() + (ttl or self.ttl)}\n'.encode())
+            f.write(value)
+        os.replace(tmp, path)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+_backend = None
+_backend_lock = threading.Lock()
+_result_cache = None
+
+def create_backend(url: str):
+    scheme = urlparse(url).scheme
+    if scheme == 'memory':
+        return MemoryBackend(ttl=settings.cache_ttl)
+    if scheme in ('redis', 'tcp'):
+        return RedisBackend(url, prefix=settings.cache_prefix)
+    if scheme == 'file':
+        parsed = urlparse(url)
+        return FileBackend(parsed.netloc + parsed.path, ttl=settings.cache_ttl)
+    raise ValueError(f'Unsupported cache backend: {url}')
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(settings.cache_url)
+    return _backend
+
+def get_result_cache():
+    # Resume and GitHub analysis results are keyed by content, so they outlive restarts and
+    # are shared by every worker process through the filesystem
+    global _result_cache
+    if not settings.result_cache_dir:
+        return None
+    if _result_cache is None:
+        with _backend_lock:
+            if _result_cache is None:
+                _result_cache = FileBackend(settings.result_cache_dir, ttl=settings.result_cache_ttl)
+    return _result_cache
+
+# Keys include the row version, so a write in any process makes older cached bodies unreachable;
+# the row token keeps a reused id from reaching a deleted row's body
+def item_key(item_id: int, row_token: str, version: int) -> str:
+    return f'item:{item_id}:{row_token}:v{version}'
+
+def user_key(user_id: int, row_token: str, version: int) -> str:
+    return f'user:{user_id}:{row_token}:v{version}'
+
+STATS_KEY = 'admin:stats'
+
+def cached_json(key: str, compute, ttl: int = None):
+    backend = get_backend()
+    try:
+        raw = backend.get(key)
+    except (OSError, CacheError) as exc:
+        logger.warning(f'Cache read failed for {key}: {exc}')
+        raw = None
+    if raw is not None:
+        return json.loads(raw)
+    value = compute()
+    if value is None:
+        return None
+    data = jsonable_encoder(value)
+    try:
+        backend.set(key, json.dumps(data).encode(), ttl or settings.cache_ttl)
+    except (OSError, CacheError) as exc:
+        logger.warning(f'Cache write failed for {key}: {exc}')
+    return data
+
+def invalidate(*keys: str):
+    try:
+        get_backend().delete(*keys)
+    except (OSError, CacheError) as exc:
+        logger.warning(f'Cache invalidation failed for {keys}: {exc}')
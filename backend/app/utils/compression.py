@@ -0,0 +1,161 @@
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class _GzipEncoder:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        # Sync-flush each chunk so streamed responses reach the client incrementally
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+class _BrotliEncoder:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data):
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+class _ZstdEncoder:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+ENCODERS = {'gzip': _GzipEncoder}
+if zstandard is not None:
+    ENCODERS['zstd'] = _ZstdEncoder
+if brotli is not None:
+    ENCODERS['br'] = _BrotliEncoder
+
+# Server preference when the client accepts several encodings equally
+PREFERENCE = ('br', 'zstd', 'gzip')
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+    candidates = [name for name in PREFERENCE if name in available and weights.get(name, weights.get('*', 0)) > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda name: weights.get(name, weights.get('*', 0)))
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, content_types=('application/json',), level: int = 6, encodings=None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.level = level
+        self.encodings = {name: ENCODERS[name] for name in (encodings or ENCODERS) if name in ENCODERS}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+class _CompressionResponder:
+    def __init__(self, middleware, encoding, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _eligible(self, message):
+        headers = Headers(raw=message['headers'])
+        if message['status'] < 200 or message['status'] in (204, 206, 304):
+            return False
+        if 'content-encoding' in headers or 'content-range' in headers:
+            return False
+        content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        return content_type.startswith(self.middleware.content_types)
+
+    def _start_compressed(self):
+        headers = MutableHeaders(raw=self.start_message['headers'])
+        headers['Content-Encoding'] = self.encoding
+        headers.add_vary_header('Accept-Encoding')
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            # The encoded bytes differ from the identity body the handler tagged, so the tag can only be weak;
+            # not_modified compares weakly, so revalidation still gets a 304
+            headers['ETag'] = 'W/' + etag
+        if 'content-length' in headers:
+            del headers['Content-Length']
+        self.encoder = self.middleware.encodings[self.encoding](self.middleware.level)
+
+    async def __call__(self, message):
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message['type'] == 'http.response.start':
+            if self._eligible(message):
+                # Hold the headers until the first body chunk shows how large the body is
+                self.start_message = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.encoder is None:
+            if not more_body:
+                if len(body) < self.middleware.minimum_size:
+                    self.passthrough = True
+                    await self.send(self.start_message)
+                    await self.send(message)
+                    return
+                self._start_compressed()
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                MutableHeaders(raw=self.start_message['headers'])['Content-Length'] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({'type': 'http.response.body', 'body': compressed})
+                return
+            # Streaming: the total size is unknown, so compress chunk by chunk
+            self._start_compressed()
+            await self.send(self.start_message)
+
+        chunk = self.encoder.compress(body) if body else b''
+        if not more_body:
+            chunk += self.encoder.finish()
+        if chunk or not more_body:
+            await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response, status
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; CURRENT_TIMESTAMP is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def version_headers(kind: str, row_id: int, row_token: str, version: int, created_at: Optional[datetime], updated_at: Optional[datetime]) -> dict:
+    # The ETag comes from the row token and integer version; Last-Modified is second-resolution only
+    headers = {'ETag': f'"{kind}{row_id}-{row_token}-v{version}"', 'Cache-Control': 'no-cache'}
+    modified = updated_at or created_at
+    if modified is not None:
+        headers['Last-Modified'] = format_datetime(_as_utc(modified).replace(microsecond=0), usegmt=True)
+    return headers
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == '*':
+        return True
+    # GET uses weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix('W/') for tag in header.split(','))
+    return etag in candidates
+
+def _not_modified_since(header: str, last_modified: Optional[str]) -> bool:
+    if not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return parsedate_to_datetime(last_modified) <= _as_utc(since)
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, headers['ETag'])
+    else:
+        if_modified_since = request.headers.get('if-modified-since')
+        fresh = if_modified_since is not None and _not_modified_since(if_modified_since, headers.get('Last-Modified'))
+    if fresh:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -1,6 +1,8 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
+from app import database
 from app.database import SessionLocal
+from app.auth import get_current_user, get_current_admin_user  # noqa: F401 (re-exported for routers)
 
 def get_db():
     db = SessionLocal()
@@ -8,3 +10,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    database.get_async_engine()
+    async with database.AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.database import SessionLocal
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def _ndjson_chunk(columns, rows):
+    return ''.join(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in rows)
+
+def _csv_chunk(columns, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def _generate(statement, fmt):
+    # The request's session may be closed before the body is streamed, so own one here
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=settings.export_batch_size))
+        columns = list(result.keys())
+        if fmt == 'csv':
+            yield _csv_chunk(columns, [columns])
+        write_chunk = _csv_chunk if fmt == 'csv' else _ndjson_chunk
+        for rows in result.partitions():
+            yield write_chunk(columns, rows)
+    finally:
+        db.close()
+
+def stream_export(statement, fmt: str, filename: str):
+    return StreamingResponse(
+        _generate(statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'}
+    )
@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import HTTPException
+from pydantic import BaseModel
+from app.utils.serialization import FastJSONResponse
+
+SUMMARY = 'summary'
+
+def parse_fields(fields: Optional[str], schema: type[BaseModel], summary: type[BaseModel]) -> Optional[list[str]]:
+    if not fields:
+        return None
+    if fields == SUMMARY:
+        requested = list(summary.__fields__)
+    else:
+        requested = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = set(requested) - set(schema.__fields__)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f'Unknown fields: {", ".join(sorted(unknown))}')
+    # id is always selected so keyset pagination keeps working
+    return ['id'] + [name for name in dict.fromkeys(requested) if name != 'id']
+
+def rows_response(rows) -> FastJSONResponse:
+    return FastJSONResponse(content=[row._asdict() for row in rows])
@@ -0,0 +1,36 @@
+import asyncio
+import importlib
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+# ASGI app that imports a router module on its first request
+class LazyRouterApp:
+    def __init__(self, module: str, **router_kwargs):
+        self.module = module
+        self.router_kwargs = router_kwargs
+        self._app = None
+        self._lock = asyncio.Lock()
+
+    async def _load(self):
+        async with self._lock:
+            if self._app is None:
+                # Heavy imports (pandas, scikit-learn) run off the event loop
+                try:
+                    module = await run_in_threadpool(importlib.import_module, self.module)
+                except ModuleNotFoundError as exc:
+                    # Only a missing router module means "not deployed"; broken imports inside it still raise
+                    if exc.name is None or not self.module.startswith(exc.name):
+                        raise
+                    self._app = JSONResponse({'detail': 'Not Found'}, status_code=404)
+                    return self._app
+                app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+                app.include_router(module.router, **self.router_kwargs)
+                self._app = app
+        return self._app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return
+        app = self._app or await self._load()
+        await app(scope, receive, send)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import re
+from email.utils import formatdate
+from typing import Optional
+import anyio
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import FileResponse
+from app.utils.cache import TTLCache
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# For files without the hash in their name; keyed by (path, size, mtime) so a replaced file
+# is rehashed, unchanged ones never are
+_digests = TTLCache(maxsize=4096, ttl=24 * 3600)
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def file_etag(path, stat_result: os.stat_result) -> str:
+    key = (str(path), stat_result.st_size, stat_result.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        digest = await run_in_threadpool(_sha256, path)
+        _digests.set(key, digest)
+    return f'"{digest}"'
+
+def file_headers(etag: str, stat_result: os.stat_result, max_age: int) -> dict:
+    return {
+        'ETag': etag,
+        'Last-Modified': formatdate(stat_result.st_mtime, usegmt=True),
+        'Cache-Control': f'private, max-age={max_age}',
+        'Accept-Ranges': 'bytes',
+    }
+
+def parse_range(request: Request, etag: str, size: int) -> Optional[tuple[int, int]]:
+    # Returns an inclusive (start, end) for a single satisfiable range, None to send the whole file
+    header = request.headers.get('range')
+    if not header:
+        return None
+    if_range = request.headers.get('if-range')
+    if if_range is not None and if_range.strip() != etag:
+        return None
+    match = BYTE_RANGE.match(header.strip())
+    if match is None:
+        # Multiple or non-byte ranges are optional for servers; fall back to a full response
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            raise _unsatisfiable(size)
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise _unsatisfiable(size)
+    return start, end
+
+def _unsatisfiable(size):
+    return HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail='Requested range not satisfiable',
+        headers={'Content-Range': f'bytes */{size}'},
+    )
+
+class RangeFileResponse(FileResponse):
+    def __init__(self, path, byte_range: Optional[tuple[int, int]] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        size = self.stat_result.st_size
+        self.start, self.end = byte_range or (0, size - 1)
+        if byte_range is not None:
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            self.headers['content-range'] = f'bytes {self.start}-{self.end}/{size}'
+            self.headers['content-length'] = str(self.end - self.start + 1)
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        count = self.end - self.start + 1
+        if self.send_header_only or count <= 0:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+        if 'http.response.zerocopysend' in scope.get('extensions', {}):
+            # Servers with the zero-copy extension hand the descriptor to sendfile()
+            with open(self.path, 'rb') as f:
+                await send({'type': 'http.response.zerocopysend', 'file': f.fileno(), 'offset': self.start, 'count': count, 'more_body': False})
+            return
+        async with await anyio.open_file(self.path, mode='rb') as f:
+            await f.seek(self.start)
+            while count > 0:
+                chunk = await f.read(min(self.chunk_size, count))
+                if not chunk:
+                    break
+                count -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': count > 0})
+        if count > 0:
+            # File shrank after stat; end the body rather than leave the response open
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
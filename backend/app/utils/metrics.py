@@ -0,0 +1,273 @@
+import bisect
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from collections import Counter
+from contextvars import Context, ContextVar
+from sqlalchemy import event
+from app.utils.cache import cache_stats
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from app.logger import logger
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_labels(labels, le=bound)} {cumulative}')
+            lines.append(f'{self.name}_bucket{_labels(labels, le="+Inf")} {count}')
+            lines.append(f'{self.name}_sum{_labels(labels)} {total}')
+            lines.append(f'{self.name}_count{_labels(labels)} {count}')
+        return lines
+
+class CounterMetric:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = Counter()
+
+    def inc(self, labels, amount=1):
+        self._values[labels] += amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        lines += [f'{self.name}{_labels(labels)} {value}' for labels, value in sorted(self._values.items())]
+        return lines
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = CounterMetric('http_requests_total', 'HTTP requests by method, route and status.')
+        self.latency = Histogram('http_request_duration_seconds', 'HTTP request latency.', LATENCY_BUCKETS)
+        self.db_queries = Histogram('http_request_db_queries', 'Database queries issued per request.', QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram('http_request_db_seconds', 'Database time spent per request.', LATENCY_BUCKETS)
+
+    def record(self, method, route, status, duration, stats):
+        labels = (('method', method), ('route', route))
+        with self.lock:
+            self.requests.inc(labels + (('status', str(status)),))
+            self.latency.observe(labels, duration)
+            self.db_queries.observe(labels, stats.queries)
+            self.db_time.observe(labels, stats.db_seconds)
+
+    def render(self):
+        with self.lock:
+            lines = ['# HELP http_requests_in_flight Requests currently being served.',
+                     '# TYPE http_requests_in_flight gauge',
+                     f'http_requests_in_flight {self.in_flight}']
+            for metric in (self.requests, self.latency, self.db_queries, self.db_time):
+                lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+# Threadpool workers inherit a copy of the request context, so they share this object
+current_request_stats = ContextVar('current_request_stats', default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start'].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+@contextmanager
+def count_queries():
+    # Outside a request (e.g. in tests) collect query stats for the enclosed block
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request_stats.reset(token)
+
+def instrument_engine(engine):
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+CACHE_METRICS = (
+    ('hits', 'cache_hits_total', 'counter', 'In-process cache lookups answered from a fresh entry.'),
+    ('misses', 'cache_misses_total', 'counter', 'In-process cache lookups that found no fresh entry.'),
+    ('evictions', 'cache_evictions_total', 'counter', 'Entries dropped for expiry or to stay under maxsize.'),
+    ('size', 'cache_entries', 'gauge', 'Entries currently held.'),
+)
+
+def _render_caches():
+    stats = sorted(cache_stats().items())
+    lines = []
+    for field, name, kind, help_text in CACHE_METRICS:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [f'{name}{_labels((("cache", cache),))} {values[field]}' for cache, values in stats]
+    return '\n'.join(lines) + '\n'
+
+def render_metrics():
+    return registry.render() + _render_caches()
+
+def route_template(app, scope):
+    for route in getattr(app, 'routes', ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    # Unmatched paths share one label to keep cardinality bounded
+    return 'unmatched'
+
+class StackSampler:
+    IDLE_MODULES = ('threading.py', 'selectors.py', 'queue.py')
+
+    def __init__(self, interval, stats, frame):
+        self.interval = interval
+        # What identifies the request: its stats object (copied into threadpool workers with the
+        # request context) and the middleware frame its coroutines run under on the event loop
+        self.stats = stats
+        self.frame = frame
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or frame.f_code.co_filename.endswith(self.IDLE_MODULES):
+                    continue
+                stack = self._request_stack(frame)
+                if stack:
+                    self.samples[';'.join(reversed(stack))] += 1
+
+    def _request_stack(self, frame):
+        # Other requests share the event loop and the threadpool, so a stack only counts while
+        # this request is what the thread is running
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+            if frame is self.frame:
+                return stack
+            # Threadpool workers run each call as context.run(func) in a copy of the caller's context
+            context = frame.f_locals.get('context') if code.co_name == 'run' else None
+            if isinstance(context, Context):
+                return stack if context.get(current_request_stats) is self.stats else None
+            frame = frame.f_back
+        return None
+
+    def dump(self, path):
+        # Collapsed-stack format understood by flamegraph.pl and speedscope
+        with open(path, 'w') as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f'{stack} {count}\n')
+
+class MetricsMiddleware:
+    def __init__(self, app, profile_threshold_ms: int = 0, profile_sample_rate: float = 0.0,
+                 profile_interval: float = 0.005, profile_dir: str = './profiles',
+                 query_budget: int = 0, query_budget_strict: bool = False):
+        self.app = app
+        self.query_budget = query_budget
+        self.query_budget_strict = query_budget_strict
+        self.profile_threshold = profile_threshold_ms / 1000
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_interval = profile_interval
+        self.profile_dir = profile_dir
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        sampler = None
+        if self.profile_threshold and random.random() < self.profile_sample_rate:
+            sampler = StackSampler(self.profile_interval, stats, sys._getframe())
+            sampler.start()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        with registry.lock:
+            registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            with registry.lock:
+                registry.in_flight -= 1
+            current_request_stats.reset(token)
+            route = route_template(scope.get('app'), scope)
+            registry.record(scope['method'], route, status_code, duration, stats)
+            if sampler is not None:
+                # Joining the sampler and writing the profile both block, so keep them off the event loop
+                await run_in_threadpool(self._finish_profile, sampler, scope, duration)
+        if self.query_budget and stats.queries > self.query_budget:
+            self._over_budget(scope, route, stats)
+
+    def _over_budget(self, scope, route, stats):
+        message = f'{scope["method"]} {route} issued {stats.queries} queries (budget {self.query_budget}); likely N+1'
+        if self.query_budget_strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def _finish_profile(self, sampler, scope, duration):
+        sampler.stop()
+        if duration < self.profile_threshold:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f'{int(time.time() * 1000)}-{scope["method"]}-{scope["path"].strip("/").replace("/", "_") or "root"}.folded'
+        path = os.path.join(self.profile_dir, name)
+        sampler.dump(path)
+        logger.warning(f'Slow request {scope["method"]} {scope["path"]} took {duration * 1000:.0f} ms; profile written to {path}')
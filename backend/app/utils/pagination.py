@@ -0,0 +1,21 @@
+import base64
+import json
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))['id'])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+def set_next_cursor(response: Response, rows: list, limit: int):
+    # A short page means there is nothing left to fetch
+    if rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
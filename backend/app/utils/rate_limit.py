@@ -1,17 +1,100 @@
+import hashlib
+import math
+import threading
 import time
-from functools import wraps
-
-def rate_limit(max_calls: int, time_window: int):
-    def decorator(func):
-        calls = []
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            nonlocal calls
-            now = time.time()
-            calls = [call for call in calls if now - call < time_window]
-            if len(calls) >= max_calls:
-                raise Exception('Rate limit exceeded')
-            calls.append(now)
-            return func(*args, **kwargs)
-        return wrapper
-    return decorator
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from app.config import settings
+from app.utils.cache import CacheError, RedisBackend
+from app.logger import logger
+
+class SlidingWindowLimiter:
+    def __init__(self, max_calls: int, time_window: int, backend: RedisBackend = None):
+        self.max_calls = max_calls
+        self.time_window = time_window
+        self.backend = backend
+        # key -> [window index, current count, previous count], oldest first
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _retry_after(self, current, previous, elapsed):
+        if current >= self.max_calls or not previous:
+            return self.time_window - elapsed
+        # Wait until the previous window's weighted share drops enough to admit one call
+        wait = self.time_window * (1 - (self.max_calls - current) / previous) - elapsed
+        return max(wait, 0.001)
+
+    def _estimate(self, current, previous, elapsed):
+        return previous * (1 - elapsed / self.time_window) + current
+
+    def _hit_local(self, key, window, elapsed):
+        with self._lock:
+            counter = self._counters.pop(key, None)
+            if counter is None or counter[0] < window - 1:
+                counter = [window, 0, 0]
+            elif counter[0] == window - 1:
+                counter = [window, 0, counter[1]]
+            self._counters[key] = counter
+            # Entries are kept in last-seen order, so stale ones collect at the front
+            while self._counters:
+                oldest = next(iter(self._counters.values()))
+                if oldest[0] >= window - 1:
+                    break
+                self._counters.popitem(last=False)
+            _, current, previous = counter
+            if self._estimate(current, previous, elapsed) >= self.max_calls:
+                return self._retry_after(current, previous, elapsed)
+            counter[1] += 1
+            return 0
+
+    def _hit_shared(self, key, window, elapsed):
+        current_key = f'rl:{key}:{window}'
+        current = self.backend.incr(current_key, self.time_window * 2)
+        previous = int(self.backend.get(f'rl:{key}:{window - 1}') or 0)
+        if self._estimate(current - 1, previous, elapsed) >= self.max_calls:
+            self.backend.decr(current_key)
+            return self._retry_after(current - 1, previous, elapsed)
+        return 0
+
+    def hit(self, key: str) -> float:
+        now = time.time()
+        window, offset = divmod(now, self.time_window)
+        window = int(window)
+        if self.backend is not None:
+            try:
+                return self._hit_shared(key, window, offset)
+            except (OSError, CacheError) as exc:
+                logger.warning(f'Shared rate limit backend failed, using local counters: {exc}')
+        return self._hit_local(key, window, offset)
+
+def client_key(request: Request) -> str:
+    # Raw X-API-Key/Authorization headers are client-chosen, so rotating them must not buy a
+    # fresh bucket. Only an identity an auth dependency has verified and stored on
+    # request.state replaces the IP, and it is hashed so credentials never appear in key names.
+    identity = getattr(request.state, 'rate_limit_identity', None)
+    if identity:
+        return 'auth:' + hashlib.sha256(str(identity).encode()).hexdigest()[:32]
+    host = request.client.host if request.client else 'unknown'
+    return f'ip:{host}'
+
+_shared_backend = None
+
+def get_shared_backend():
+    global _shared_backend
+    if _shared_backend is None and settings.rate_limit_url:
+        _shared_backend = RedisBackend(settings.rate_limit_url, prefix=settings.cache_prefix)
+    return _shared_backend
+
+def rate_limit(max_calls: int, time_window: int, key_func=client_key):
+    limiter = SlidingWindowLimiter(max_calls, time_window, backend=get_shared_backend())
+
+    def dependency(request: Request):
+        retry_after = limiter.hit(f'{request.url.path}:{key_func(request)}')
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='Rate limit exceeded',
+                headers={'Retry-After': str(math.ceil(retry_after))}
+            )
+    dependency.limiter = limiter
+    return dependency
@@ -0,0 +1,33 @@
+import json
+import operator
+from datetime import date, datetime
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+class FastJSONResponse(JSONResponse):
+    # Serialises plain dicts/lists directly; uses orjson when it is installed
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+def row_mapper(schema: type[BaseModel]):
+    # Precompute the attribute getter once per schema instead of validating every row
+    names = tuple(schema.__fields__)
+    getter = operator.attrgetter(*names)
+    if len(names) == 1:
+        return lambda obj: {names[0]: getter(obj)}
+    return lambda obj: dict(zip(names, getter(obj)))
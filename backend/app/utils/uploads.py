@@ -0,0 +1,77 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+def _too_large(max_bytes):
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f'Upload exceeds {max_bytes} bytes')
+
+def _wrong_type():
+    return HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail='Upload content does not match its declared type')
+
+def _write(f, data):
+    f.write(data)
+
+def _finish(f, tmp_path, final_path):
+    # fsync the file before the rename and the directory after it, so a crash leaves
+    # either no file or the complete one
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+    os.replace(tmp_path, final_path)
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(final_path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _discard(f, tmp_path):
+    f.close()
+    tmp_path.unlink(missing_ok=True)
+
+async def store_upload(request: Request, directory: str, max_bytes: int, chunk_size: int, suffix: str = '', magic: bytes = b'') -> dict:
+    # Reads the raw request body, so at most one chunk of the upload is held in memory
+    declared = request.headers.get('content-length')
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise _too_large(max_bytes)
+    target_dir = Path(directory)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    upload_id = str(uuid.uuid4())
+    # Temp file in the target directory keeps the final rename on one filesystem
+    tmp_path = target_dir / f'.{upload_id}.part'
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    # The buffer is only flushed once it reaches chunk_size, so it still holds the first bytes here
+    checked = not magic
+    f = await run_in_threadpool(open, tmp_path, 'wb')
+    try:
+        async for data in request.stream():
+            size += len(data)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            digest.update(data)
+            buffer += data
+            if not checked and len(buffer) >= len(magic):
+                if not buffer.startswith(magic):
+                    raise _wrong_type()
+                checked = True
+            if len(buffer) >= chunk_size:
+                await run_in_threadpool(_write, f, buffer)
+                buffer.clear()
+        if not size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Empty upload')
+        if not checked:
+            raise _wrong_type()
+        if buffer:
+            await run_in_threadpool(_write, f, buffer)
+        # The content hash goes in the name, so readers get a strong ETag without rereading the file
+        name = f'{upload_id}-{digest.hexdigest()}{suffix}'
+        await run_in_threadpool(_finish, f, tmp_path, target_dir / name)
+    except BaseException:
+        await run_in_threadpool(_discard, f, tmp_path)
+        raise
+    return {'filename': name, 'sha256': digest.hexdigest(), 'size': size}
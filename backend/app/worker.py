@@ -0,0 +1,73 @@
+"""
+Background job worker pool.
+
+Usage (from backend/):
+    python -m app.worker [concurrency]
+
+Starts `concurrency` worker processes (default JOB_WORKERS) that poll the jobs table.
+SIGTERM/SIGINT stop claiming new jobs and wait for running ones to finish.
+"""
+
+import importlib
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from app.config import settings
+from app.logger import logger
+
+def _work(index, stop):
+    # The parent handles signals and tells children to stop through the shared event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    from app.services.jobs import TASK_MODULES, run_next_job
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+    worker_id = f'{socket.gethostname()}:{os.getpid()}:{index}'
+    logger.info(f'Worker {worker_id} started')
+    while not stop.is_set():
+        try:
+            busy = run_next_job(worker_id)
+        except Exception:
+            # Database hiccups shouldn't kill the worker; back off and poll again
+            logger.exception(f'Worker {worker_id} poll failed')
+            busy = False
+        if not busy:
+            stop.wait(settings.job_poll_interval)
+
+def main(argv):
+    concurrency = int(argv[1]) if len(argv) > 1 else settings.job_workers
+    # spawn gives each worker its own engine and pool instead of forked sockets
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+
+    def _start(index):
+        process = context.Process(target=_work, args=(index, stop), name=f'worker-{index}')
+        process.start()
+        return process
+
+    stopping = []
+
+    # Setting a multiprocessing Event from a handler can deadlock with the main loop's wait()
+    def _shutdown(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+    processes = [_start(index) for index in range(concurrency)]
+    while not stopping:
+        for index, process in enumerate(processes):
+            if not process.is_alive():
+                logger.warning(f'{process.name} exited with {process.exitcode}, restarting')
+                processes[index] = _start(index)
+        time.sleep(1)
+    logger.info('Stopping workers after their current jobs')
+    stop.set()
+    for process in processes:
+        process.join()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,70 @@
+"""
+Measure bandwidth and latency impact of CompressionMiddleware on list-sized payloads.
+
+Payloads:
+    items      - 100 rows shaped like GET /api/items/?limit=100
+    candidates - 20 candidate records built from github_data_mocks.json
+
+Usage (from backend/):
+    python -m benchmarks.bench_compression [repeats] [link_mbit]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils.compression import ENCODERS, CompressionMiddleware
+
+MOCKS = Path(__file__).resolve().parent.parent / 'github_data_mocks.json'
+
+def build_payloads():
+    items = [
+        {'id': i, 'title': f'Item {i}', 'description': 'Lorem ipsum dolor sit amet ' * 8, 'owner_id': i % 50 + 1}
+        for i in range(100)
+    ]
+    mocks = list(json.loads(MOCKS.read_text()).values())
+    candidates = [{'id': i, 'github_data': mocks[i % len(mocks)]} for i in range(20)]
+    return {'items': items, 'candidates': candidates}
+
+def build_app(payloads, compressed):
+    app = FastAPI()
+    if compressed:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024, content_types=['application/json'])
+    for name, payload in payloads.items():
+        app.add_api_route(f'/{name}', lambda payload=payload: payload)
+    return app
+
+def measure(client, path, encoding, repeats):
+    headers = {'Accept-Encoding': encoding}
+    response = client.get(path, headers=headers)
+    wire_bytes = int(response.headers.get('content-length', len(response.content)))
+    start = time.perf_counter()
+    for _ in range(repeats):
+        client.get(path, headers=headers)
+    return wire_bytes, (time.perf_counter() - start) / repeats
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    link_mbit = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    payloads = build_payloads()
+    plain = TestClient(build_app(payloads, compressed=False))
+    compressed = TestClient(build_app(payloads, compressed=True))
+
+    print(f'repeats={repeats} link={link_mbit:g} Mbit/s encoders={",".join(ENCODERS)}')
+    print(f'{"payload":<11}{"encoding":<10}{"bytes":>9}{"ratio":>8}{"server ms":>11}{"+transfer ms":>14}')
+    for name in payloads:
+        base_bytes, base_latency = measure(plain, f'/{name}', 'identity', repeats)
+        rows = [('identity', base_bytes, base_latency)]
+        for encoding in ENCODERS:
+            rows.append((encoding, *measure(compressed, f'/{name}', encoding, repeats)))
+        for encoding, wire_bytes, latency in rows:
+            transfer = wire_bytes * 8 / (link_mbit * 1e6)
+            print(
+                f'{name:<11}{encoding:<10}{wire_bytes:>9}{base_bytes / wire_bytes:>8.1f}'
+                f'{latency * 1e3:>11.3f}{(latency + transfer) * 1e3:>14.3f}'
+            )
+
+if __name__ == '__main__':
+    main()
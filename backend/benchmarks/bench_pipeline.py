@@ -0,0 +1,87 @@
+"""
+Compare sequential resume processing with the staged pipeline in app.services.pipeline.
+
+Resumes are synthetic text files and the GitHub stage uses the offline stub transport,
+so the run needs no network. Stub latency stands in for real GitHub API round trips.
+The pipeline is then rerun against an empty and a warm on-disk result cache.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline [candidates] [github_latency_ms]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.config import settings
+from app.services.github import GitHubClient, github_login, stub_transport
+from app.services.pipeline import SKILLS, extract_text, run_pipeline, score_candidate
+
+FILLER = 'Delivered features across the stack, mentored engineers and improved reliability. ' * 40
+
+def write_resumes(directory, count):
+    rng = random.Random(0)
+    skills = sorted(SKILLS)
+    candidates = []
+    for index in range(count):
+        path = Path(directory) / f'resume_{index}.txt'
+        path.write_text(f'Candidate {index}\nSkills: {", ".join(rng.sample(skills, 8))}\n{FILLER}')
+        candidates.append({
+            'resume_path': str(path),
+            'github_url': f'https://github.com/candidate-{index}',
+            'focus': ' '.join(rng.sample(skills, 3)),
+        })
+    return candidates
+
+async def sequential(candidates, latency):
+    results = []
+    async with GitHubClient(concurrency=1, transport=stub_transport(latency)) as client:
+        for candidate in candidates:
+            text = extract_text(candidate['resume_path'])
+            github = await client.analyse(github_login(candidate['github_url']))
+            results.append(score_candidate(text, github, candidate['focus']))
+    return results
+
+async def pipelined(candidates, latency):
+    async with GitHubClient(transport=stub_transport(latency)) as client:
+        return await run_pipeline(candidates, github=client)
+
+def timed(coroutine):
+    start = time.perf_counter()
+    results = asyncio.run(coroutine)
+    return time.perf_counter() - start, results
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        candidates = write_resumes(directory, count)
+        settings.result_cache_dir = ''
+        sequential_seconds, expected = timed(sequential(candidates, latency))
+        pipeline_seconds, results = timed(pipelined(candidates, latency))
+        # Set in the environment too, so spawned pool workers pick up the same cache
+        os.environ['RESULT_CACHE_DIR'] = settings.result_cache_dir = str(Path(directory) / 'cache')
+        cold_seconds, _ = timed(pipelined(candidates, latency))
+        warm_seconds, cached = timed(pipelined(candidates, latency))
+    errors = [result['error'] for result in results if 'error' in result]
+    assert not errors, errors[:3]
+    assert [result['score'] for result in results] == [result['score'] for result in expected]
+    assert [result['score'] for result in cached] == [result['score'] for result in expected]
+    print(json.dumps({
+        'candidates': count,
+        'github_latency_ms': latency * 1000,
+        'sequential_seconds': round(sequential_seconds, 2),
+        'pipeline_seconds': round(pipeline_seconds, 2),
+        'speedup': round(sequential_seconds / pipeline_seconds, 1),
+        'cache_cold_seconds': round(cold_seconds, 2),
+        'cache_warm_seconds': round(warm_seconds, 2),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare per-row cost of the default list response path against the fast path.
+
+Default: ORM object -> ItemResponse.from_orm -> jsonable_encoder -> JSONResponse.render
+Fast:    ORM object -> precompiled row mapper -> FastJSONResponse.render
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [rows] [repeats]
+"""
+
+import json
+import sys
+import timeit
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.item import Item
+from app.models.user import User  # noqa: F401  (registers the Item.owner target)
+from app.schemas.item import ItemResponse
+from app.utils.serialization import FastJSONResponse, orjson, row_mapper
+
+def make_items(count):
+    return [
+        Item(id=i, title=f'Item {i}', description='Lorem ipsum dolor sit amet ' * 8, owner_id=i % 50 + 1)
+        for i in range(count)
+    ]
+
+def default_path(items):
+    models = [ItemResponse.from_orm(item) for item in items]
+    return JSONResponse(content=jsonable_encoder(models)).body
+
+def fast_path(items, mapper=row_mapper(ItemResponse)):
+    return FastJSONResponse(content=[mapper(item) for item in items]).body
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    items = make_items(rows)
+    assert json.loads(default_path(items)) == json.loads(fast_path(items))
+
+    print(f'rows={rows} repeats={repeats} orjson={"yes" if orjson else "no"}')
+    results = {}
+    for name, func in (('default', default_path), ('fast', fast_path)):
+        best = min(timeit.repeat(lambda: func(items), number=repeats, repeat=5)) / repeats
+        results[name] = best
+        print(f'{name:>8}: {best * 1e3:8.3f} ms/response  {best / rows * 1e6:8.2f} us/row')
+    print(f' speedup: {results["default"] / results["fast"]:.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Track application startup cost: cold import of app.main and time to first request.
+
+Each measurement runs in a fresh interpreter so module caches don't hide import cost.
+Prints one JSON object, suitable for storing as a CI artifact.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [runs]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+COLD_IMPORT = '''
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+'''
+
+FIRST_REQUEST = '''
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+import app.main
+with TestClient(app.main.app) as client:
+    client.get('/api/health/liveness')
+print(time.perf_counter() - start)
+'''
+
+HEAVY_MODULES = '''
+import sys
+import app.main
+print(' '.join(name for name in ('pandas', 'numpy', 'sklearn') if name in sys.modules))
+'''
+
+def run(snippet, env=None):
+    result = subprocess.run(
+        [sys.executable, '-c', snippet], cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ''
+
+def measure(snippet, runs):
+    samples = [float(run(snippet)) for _ in range(runs)]
+    return {'median_ms': round(statistics.median(samples) * 1000, 1), 'max_ms': round(max(samples) * 1000, 1)}
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    report = {
+        'runs': runs,
+        'cold_import': measure(COLD_IMPORT, runs),
+        'time_to_first_request': measure(FIRST_REQUEST, runs),
+        'heavy_modules_at_import': run(HEAVY_MODULES).split(),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
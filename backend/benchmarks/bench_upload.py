@@ -0,0 +1,108 @@
+"""
+Peak server RSS for concurrent resume uploads: streamed to disk vs buffered in memory.
+
+Each mode runs in its own uvicorn subprocess, receives `uploads` concurrent bodies of
+`size_mb` MB, and reports its peak RSS (ru_maxrss) afterwards.
+
+    streamed - app.utils.uploads.store_upload (chunked temp file, fsync, rename)
+    buffered - await request.body() then a single write, as a naive handler would
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload [uploads] [size_mb]
+"""
+
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+import httpx
+
+SEND_CHUNK = 64 * 1024
+
+def create_app(mode, directory):
+    from fastapi import FastAPI, Request
+    from app.config import settings
+    from app.utils.uploads import store_upload
+    app = FastAPI()
+
+    @app.post('/upload')
+    async def upload(request: Request):
+        if mode == 'streamed':
+            return await store_upload(request, directory, max_bytes=64 * 1024 * 1024, chunk_size=settings.upload_chunk_size, suffix='.pdf', magic=b'%PDF-')
+        body = await request.body()
+        path = Path(directory) / f'{uuid.uuid4()}.pdf'
+        path.write_bytes(body)
+        return {'filename': path.name, 'size': len(body)}
+
+    @app.get('/rss')
+    def rss():
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'peak_rss_mb': round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)}
+
+    return app
+
+def serve(mode, port, directory):
+    import uvicorn
+    uvicorn.run(create_app(mode, directory), host='127.0.0.1', port=port, log_level='warning')
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def _body(size):
+    block = os.urandom(SEND_CHUNK)
+    yield b'%PDF-'
+    for offset in range(5, size, SEND_CHUNK):
+        yield block[:min(SEND_CHUNK, size - offset)]
+
+async def _run_clients(base_url, uploads, size):
+    limits = httpx.Limits(max_connections=uploads)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        for _ in range(100):
+            try:
+                await client.get('/rss')
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post('/upload', content=_body(size), headers={'content-type': 'application/pdf', 'content-length': str(size)})
+            for _ in range(uploads)
+        ))
+        elapsed = time.perf_counter() - start
+        assert all(response.status_code in (200, 201) for response in responses), {r.status_code for r in responses}
+        return elapsed, (await client.get('/rss')).json()['peak_rss_mb']
+
+def measure(mode, uploads, size):
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        server = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_upload', 'serve', mode, str(port), directory])
+        try:
+            elapsed, peak = asyncio.run(_run_clients(f'http://127.0.0.1:{port}', uploads, size))
+        finally:
+            server.terminate()
+            server.wait()
+    return {'seconds': round(elapsed, 2), 'peak_rss_mb': peak}
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    size = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 10 * 1024 * 1024
+    report = {'uploads': uploads, 'size_mb': size / (1024 * 1024)}
+    for mode in ('streamed', 'buffered'):
+        report[mode] = measure(mode, uploads, size)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.main import app
+from app.migrations import run_migrations
+from app.utils.dependencies import get_current_user, get_db
+
+# The real app on a throwaway in-memory database, with writes authenticated as user 1
+@pytest.fixture
+def client():
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    run_migrations(engine)
+    factory = sessionmaker(bind=engine)
+
+    def session():
+        with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_current_user] = lambda: {'id': 1}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    engine.dispose()
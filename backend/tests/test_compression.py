@@ -0,0 +1,21 @@
+def _large_item(client):
+    # Big enough to pass the 1024-byte compression threshold
+    response = client.post('/api/items/', json={'title': 'large', 'description': 'x' * 1000})
+    assert response.status_code == 201
+    return response.json()['id']
+
+def test_compressed_read_has_weak_etag(client):
+    item_id = _large_item(client)
+    response = client.get(f'/api/items/{item_id}', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['etag'].startswith('W/"i')
+    assert response.json()['description'] == 'x' * 1000
+
+    revalidated = client.get(f'/api/items/{item_id}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['etag']})
+    assert revalidated.status_code == 304
+
+def test_identity_read_keeps_strong_etag(client):
+    item_id = _large_item(client)
+    response = client.get(f'/api/items/{item_id}', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert response.headers['etag'].startswith('"i')
@@ -0,0 +1,71 @@
+from typing import Optional
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.crud.item import get_items
+from app.migrations import run_migrations
+from app.models.item import Item
+from app.models.user import User
+from app.utils.metrics import MetricsMiddleware, QueryBudgetExceeded, count_queries, instrument_engine
+
+OWNERS = 3
+ITEMS_PER_OWNER = 4
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    run_migrations(engine)
+    instrument_engine(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        owners = [User(email=f'owner{n}@example.com', name=f'owner{n}', hashed_password='x') for n in range(OWNERS)]
+        db.add_all(owners)
+        db.flush()
+        db.add_all(
+            Item(title=f'item {owner.id}-{n}', description='d', owner_id=owner.id)
+            for owner in owners for n in range(ITEMS_PER_OWNER)
+        )
+        db.commit()
+    yield factory
+    engine.dispose()
+
+def test_count_queries_selectin_owners(session_factory):
+    with session_factory() as db, count_queries() as stats:
+        items = get_items(db, owner_loading='selectin')
+        owners = {item.owner.email for item in items}
+    assert len(owners) == OWNERS
+    # Page query plus one IN query for every owner
+    assert stats.queries == 2
+
+def test_count_queries_lazy_owners(session_factory):
+    with session_factory() as db, count_queries() as stats:
+        items = get_items(db)
+        for item in items:
+            item.owner.email
+    # Page query plus one lazy load per distinct owner
+    assert stats.queries == 1 + OWNERS
+
+def _app(session_factory, budget):
+    app = FastAPI()
+
+    @app.get('/items')
+    def list_items(owner_loading: Optional[str] = None):
+        with session_factory() as db:
+            return [{'title': item.title, 'owner': item.owner.name} for item in get_items(db, owner_loading=owner_loading)]
+
+    app.add_middleware(MetricsMiddleware, query_budget=budget, query_budget_strict=True)
+    return app
+
+def test_strict_budget_allows_eager_loading(session_factory):
+    client = TestClient(_app(session_factory, budget=2))
+    response = client.get('/items', params={'owner_loading': 'selectin'})
+    assert response.status_code == 200
+    assert len(response.json()) == OWNERS * ITEMS_PER_OWNER
+
+def test_strict_budget_rejects_n_plus_one(session_factory):
+    client = TestClient(_app(session_factory, budget=2))
+    with pytest.raises(QueryBudgetExceeded, match=r'GET /items issued 4 queries \(budget 2\)'):
+        client.get('/items')
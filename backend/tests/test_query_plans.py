@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from app.migrations import check_query_plans, run_migrations
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+def test_listing_queries_use_indexes(engine):
+    assert check_query_plans(engine) == []
+
+@pytest.mark.parametrize('index, failing', [
+    ('ix_items_owner_id_id', 'items by owner'),
+    ('ix_users_active_id', 'active users'),
+])
+def test_dropped_index_is_reported(engine, index, failing):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f'DROP INDEX {index}')
+    # The cursor variants can still range-scan the rowid, so only require the first page to regress
+    names = {failure.split(':')[0] for failure in check_query_plans(engine)}
+    assert failing in names
+    assert names <= {failing, f'{failing}, after cursor'}
@@ -0,0 +1,130 @@
+import fnmatch
+import socketserver
+import threading
+import pytest
+from app.utils.cache import CacheError, RedisBackend
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    """Just enough of the RESP protocol to exercise RedisBackend against a real socket."""
+    daemon_threads = True
+    allow_reuse_address = True
+    # Real Redis treats SCAN COUNT as a hint; a small fixed page forces the client to follow the cursor
+    scan_page = 2
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.data = {}
+        self.ttls = {}
+        self.commands = []
+        self.scan_keys = []
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            assert line[:1] == b'*'
+            parts = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                parts.append(self.rfile.read(length + 2)[:-2])
+            self.server.commands.append(parts)
+            self.wfile.write(self.reply(parts[0].upper().decode(), parts[1:]))
+
+    def reply(self, name, args):
+        data, ttls = self.server.data, self.server.ttls
+        if name in ('AUTH', 'SELECT'):
+            return b'+OK\r\n'
+        if name == 'GET':
+            value = data.get(args[0])
+            return b'$-1\r\n' if value is None else bulk(value)
+        if name == 'SET':
+            data[args[0]] = args[1]
+            if len(args) == 4 and args[2].upper() == b'EX':
+                ttls[args[0]] = int(args[3])
+            return b'+OK\r\n'
+        if name in ('INCR', 'DECR'):
+            try:
+                value = int(data.get(args[0], b'0')) + (1 if name == 'INCR' else -1)
+            except ValueError:
+                return b'-ERR value is not an integer or out of range\r\n'
+            data[args[0]] = str(value).encode()
+            return b':%d\r\n' % value
+        if name == 'EXPIRE':
+            ttls[args[0]] = int(args[1])
+            return b':1\r\n'
+        if name == 'DEL':
+            removed = sum(data.pop(key, None) is not None for key in args)
+            return b':%d\r\n' % removed
+        if name == 'SCAN':
+            cursor, pattern = int(args[0]), args[args.index(b'MATCH') + 1].decode()
+            # Like Redis, every key present when the scan starts is returned even if others are deleted meanwhile
+            if cursor == 0:
+                self.server.scan_keys = sorted(data)
+            keys = self.server.scan_keys
+            page = keys[cursor:cursor + self.server.scan_page]
+            following = cursor + len(page) if cursor + len(page) < len(keys) else 0
+            matched = [key for key in page if fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b'*2\r\n' + bulk(str(following).encode()) + b'*%d\r\n' % len(matched) + b''.join(map(bulk, matched))
+        return b'-ERR unknown command\r\n'
+
+def bulk(value):
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+@pytest.fixture
+def server():
+    server = FakeRedis()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def backend(server):
+    return RedisBackend(f'redis://127.0.0.1:{server.server_address[1]}', prefix='app:')
+
+def test_set_get(backend, server):
+    assert backend.get('missing') is None
+    backend.set('item:1:v1', b'{"id": 1}', ttl=60)
+    assert backend.get('item:1:v1') == b'{"id": 1}'
+    assert server.data == {b'app:item:1:v1': b'{"id": 1}'}
+    assert server.ttls == {b'app:item:1:v1': 60}
+
+def test_incr_sets_expiry_once(backend, server):
+    assert backend.incr('rate:ip:1', ttl=30) == 1
+    assert backend.incr('rate:ip:1', ttl=30) == 2
+    assert backend.decr('rate:ip:1') == 1
+    assert server.ttls == {b'app:rate:ip:1': 30}
+    assert [parts[0] for parts in server.commands] == [b'INCR', b'EXPIRE', b'INCR', b'DECR']
+
+def test_delete(backend, server):
+    for key in ('a', 'b', 'c'):
+        backend.set(key, b'1', ttl=60)
+    backend.delete('a', 'b')
+    backend.delete()
+    assert list(server.data) == [b'app:c']
+    assert server.commands[-1] == [b'DEL', b'app:a', b'app:b']
+
+def test_clear_follows_scan_cursor(backend, server):
+    for n in range(5):
+        backend.set(f'key{n}', b'1', ttl=60)
+    server.data[b'other:key'] = b'kept'
+    backend.clear()
+    assert server.data == {b'other:key': b'kept'}
+    scans = [parts for parts in server.commands if parts[0] == b'SCAN']
+    assert len(scans) > 1
+    assert all(parts[3] == b'app:*' for parts in scans)
+
+def test_error_reply_raises(backend, server):
+    backend.set('name', b'text', ttl=60)
+    with pytest.raises(CacheError, match='not an integer'):
+        backend.incr('name', ttl=60)
+    # The connection stays usable after an error reply
+    assert backend.get('name') == b'text'
+
+def test_auth_and_select_from_url(server):
+    backend = RedisBackend(f'redis://:secret@127.0.0.1:{server.server_address[1]}/2')
+    backend.get('key')
+    assert server.commands == [[b'AUTH', b'secret'], [b'SELECT', b'2'], [b'GET', b'app:key']]
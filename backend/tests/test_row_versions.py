@@ -0,0 +1,40 @@
+def _register(client, email):
+    response = client.post('/api/users/', json={'email': email, 'name': email.split('@')[0], 'password': 'Secret123'})
+    assert response.status_code == 201
+    return response.json()['id']
+
+def test_update_changes_etag(client):
+    _register(client, 'owner@example.com')
+    item_id = client.post('/api/items/', json={'title': 'first', 'description': 'd'}).json()['id']
+    first = client.get(f'/api/items/{item_id}')
+    assert client.get(f'/api/items/{item_id}', headers={'If-None-Match': first.headers['etag']}).status_code == 304
+    client.put(f'/api/items/{item_id}', json={'title': 'second'})
+    second = client.get(f'/api/items/{item_id}', headers={'If-None-Match': first.headers['etag']})
+    assert second.status_code == 200
+    assert second.json()['title'] == 'second'
+
+def test_reused_user_id_is_not_served_stale(client):
+    old_id = _register(client, 'old@example.com')
+    old = client.get(f'/api/users/{old_id}')
+    assert old.json()['email'] == 'old@example.com'
+    assert client.delete(f'/api/users/{old_id}').status_code == 204
+
+    # SQLite reuses the highest rowid once it is deleted
+    new_id = _register(client, 'new@example.com')
+    assert new_id == old_id
+    new = client.get(f'/api/users/{new_id}', headers={'If-None-Match': old.headers['etag']})
+    assert new.status_code == 200
+    assert new.json()['email'] == 'new@example.com'
+    assert new.headers['etag'] != old.headers['etag']
+
+def test_reused_item_id_is_not_served_stale(client):
+    _register(client, 'owner@example.com')
+    old_id = client.post('/api/items/', json={'title': 'old', 'description': 'd'}).json()['id']
+    old = client.get(f'/api/items/{old_id}')
+    assert client.delete(f'/api/items/{old_id}').status_code == 204
+
+    new_id = client.post('/api/items/', json={'title': 'new', 'description': 'd'}).json()['id']
+    assert new_id == old_id
+    new = client.get(f'/api/items/{new_id}', headers={'If-None-Match': old.headers['etag']})
+    assert new.status_code == 200
+    assert new.json()['title'] == 'new'
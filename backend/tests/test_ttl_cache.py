@@ -0,0 +1,81 @@
+import threading
+from app.utils.cache import MemoryBackend, TTLCache
+from app.utils.metrics import render_metrics
+
+class SlowCompute:
+    def __init__(self, value):
+        self.value = value
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return self.value
+
+def _compute_in_thread(cache, key, func):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(cache.get_or_compute(key, func)))
+    thread.start()
+    return thread, results
+
+def test_concurrent_callers_share_one_computation():
+    cache = TTLCache()
+    compute = SlowCompute('value')
+    first, first_result = _compute_in_thread(cache, 'key', compute)
+    assert compute.started.wait(5)
+    second, second_result = _compute_in_thread(cache, 'key', compute)
+    compute.release.set()
+    first.join(5)
+    second.join(5)
+    assert first_result == second_result == ['value']
+    assert compute.calls == 1
+    assert cache.get('key') == 'value'
+
+def test_invalidate_during_compute_discards_result():
+    cache = TTLCache()
+    stale = SlowCompute('stale')
+    owner, owner_result = _compute_in_thread(cache, 'key', stale)
+    assert stale.started.wait(5)
+    cache.invalidate('key')
+    stale.release.set()
+    owner.join(5)
+    # The caller that started the computation still gets its answer, but it is not cached
+    assert owner_result == ['stale']
+    assert cache.get('key') is None
+    assert cache.get_or_compute('key', lambda: 'fresh') == 'fresh'
+
+def test_caller_after_invalidate_does_not_join_stale_compute():
+    cache = TTLCache()
+    stale = SlowCompute('stale')
+    owner, owner_result = _compute_in_thread(cache, 'key', stale)
+    assert stale.started.wait(5)
+    cache.invalidate('key')
+    assert cache.get_or_compute('key', lambda: 'fresh') == 'fresh'
+    stale.release.set()
+    owner.join(5)
+    assert owner_result == ['stale']
+    assert cache.get('key') == 'fresh'
+
+def test_clear_during_compute_discards_result():
+    cache = TTLCache()
+    stale = SlowCompute('stale')
+    owner, _ = _compute_in_thread(cache, 'key', stale)
+    assert stale.started.wait(5)
+    cache.clear()
+    stale.release.set()
+    owner.join(5)
+    assert cache.get('key') is None
+
+def test_stats_exported_on_metrics():
+    backend = MemoryBackend()
+    backend.set('present', b'1', ttl=60)
+    backend.get('present')
+    backend.get('absent')
+    metrics = render_metrics()
+    assert 'cache_hits_total{cache="cache_backend"} 1' in metrics
+    assert 'cache_misses_total{cache="cache_backend"} 1' in metrics
+    assert 'cache_entries{cache="cache_backend"} 1' in metrics
+    assert '# TYPE cache_evictions_total counter' in metrics